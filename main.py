@@ -9,6 +9,7 @@ Provides CLI functionality and launches the FastAPI server.
 import os
 import sys
 import argparse
+import logging
 import uvicorn
 from pathlib import Path
 
@@ -20,6 +21,8 @@ __version__ = "1.0.0"
 
 def main():
     """Main entry point for the Pixels application."""
+    logging.basicConfig(level=logging.INFO)
+
     # Create an argument parser
     parser = argparse.ArgumentParser(description="Pixels - Modern Photo Manager")
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
@@ -95,7 +98,7 @@ def main():
             host=args.host, 
             port=args.port, 
             reload=args.reload,
-            log_level="info"
+            log_level="warning"
         )
         return
     
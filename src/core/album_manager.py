@@ -11,8 +11,6 @@ from typing import Dict, List, Optional
 from .database import PhotoDatabase
 from .thumbnail_service import ThumbnailService
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -46,7 +44,7 @@ class AlbumManager:
                 return self.get_album(album_id)
             return None
         except Exception as e:
-            logger.error(f"Error creating album: {str(e)}")
+            logger.error("Error creating album: %s", e)
             return None
 
     def get_album(self, album_id: int) -> Optional[Dict]:
@@ -67,7 +65,7 @@ class AlbumManager:
                 return album
             return None
         except Exception as e:
-            logger.error(f"Error retrieving album {album_id}: {str(e)}")
+            logger.error("Error retrieving album %s: %s", album_id, e)
             return None
 
     def update_album(self, album_id: int, name: str = None, description: str = None) -> bool:
@@ -85,7 +83,7 @@ class AlbumManager:
         try:
             return self.db.update_album(album_id, name, description)
         except Exception as e:
-            logger.error(f"Error updating album {album_id}: {str(e)}")
+            logger.error("Error updating album %s: %s", album_id, e)
             return False
 
     def delete_album(self, album_id: int) -> bool:
@@ -101,7 +99,7 @@ class AlbumManager:
         try:
             return self.db.delete_album(album_id)
         except Exception as e:
-            logger.error(f"Error deleting album {album_id}: {str(e)}")
+            logger.error("Error deleting album %s: %s", album_id, e)
             return False
 
     def get_all_albums(self) -> List[Dict]:
@@ -120,7 +118,7 @@ class AlbumManager:
 
             return albums
         except Exception as e:
-            logger.error(f"Error retrieving albums: {str(e)}")
+            logger.error("Error retrieving albums: %s", e)
             return []
 
     def add_photos_to_album(self, album_id: int, photo_ids: List[int]) -> int:
@@ -141,7 +139,7 @@ class AlbumManager:
                     count += 1
             return count
         except Exception as e:
-            logger.error(f"Error adding photos to album {album_id}: {str(e)}")
+            logger.error("Error adding photos to album %s: %s", album_id, e)
             return count
 
     def remove_photos_from_album(self, album_id: int, photo_ids: List[int]) -> int:
@@ -162,7 +160,7 @@ class AlbumManager:
                     count += 1
             return count
         except Exception as e:
-            logger.error(f"Error removing photos from album {album_id}: {str(e)}")
+            logger.error("Error removing photos from album %s: %s", album_id, e)
             return count
 
     def reorder_album_photos(self, album_id: int, order_map: Dict[int, int]) -> bool:
@@ -179,7 +177,7 @@ class AlbumManager:
         try:
             return self.db.reorder_album_photos(album_id, order_map)
         except Exception as e:
-            logger.error(f"Error reordering photos in album {album_id}: {str(e)}")
+            logger.error("Error reordering photos in album %s: %s", album_id, e)
             return False
 
     def get_photos_in_album(self, album_id: int) -> List[Dict]:
@@ -196,7 +194,7 @@ class AlbumManager:
             photos = self.db.get_photos_in_album(album_id)
             return photos
         except Exception as e:
-            logger.error(f"Error retrieving photos in album {album_id}: {str(e)}")
+            logger.error("Error retrieving photos in album %s: %s", album_id, e)
             return []
 
     def get_album_photo_thumbnails(self, album_id: int, size: str = 'sm') -> Dict[int, str]:
@@ -222,7 +220,7 @@ class AlbumManager:
 
             return result
         except Exception as e:
-            logger.error(f"Error getting thumbnails for album {album_id}: {str(e)}")
+            logger.error("Error getting thumbnails for album %s: %s", album_id, e)
             return {}
 
     def get_albums_containing_photo(self, photo_id: int) -> List[Dict]:
@@ -238,7 +236,7 @@ class AlbumManager:
         try:
             return self.db.get_albums_for_photo(photo_id)
         except Exception as e:
-            logger.error(f"Error getting albums for photo {photo_id}: {str(e)}")
+            logger.error("Error getting albums for photo %s: %s", photo_id, e)
             return []
 
     def copy_album(self, album_id: int, new_name: str = None) -> Optional[int]:
@@ -285,7 +283,7 @@ class AlbumManager:
             return new_album_id
 
         except Exception as e:
-            logger.error(f"Error copying album {album_id}: {str(e)}")
+            logger.error("Error copying album %s: %s", album_id, e)
             return None
 
     def _get_album_photo_count(self, album_id: int) -> int:
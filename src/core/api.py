@@ -5,13 +5,18 @@ This module provides a RESTful API interface for the core functionality
 of the Pixels photo manager, enabling communication with the Flutter frontend.
 """
 
+import asyncio
 import datetime
+import logging
 import os
+from contextlib import asynccontextmanager
+from email.utils import formatdate
+from functools import lru_cache
 from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException, Query, Path as PathParam, Depends
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Path as PathParam, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from pydantic import BaseModel, Field
 
 from . import album_manager
@@ -21,6 +26,52 @@ from . import library_indexer
 from . import tag_manager
 from . import thumbnail_service
 
+logger = logging.getLogger(__name__)
+
+# Number of thumbnails advertised for preloading on a photo list response
+PRELOAD_THUMBNAIL_COUNT = 20
+
+# Number of thumbnail files kept in memory (about 20 MB for 10 KB thumbnails)
+THUMBNAIL_CACHE_SIZE = 2048
+
+# Seconds a client may reuse a thumbnail before revalidating it with its ETag
+THUMBNAIL_MAX_AGE = 3600
+
+
+def _get_database() -> database.PhotoDatabase:
+    """Reuse the database instance from main.py if available, else create one."""
+    try:
+        from .. import _shared_db_instance
+    except ImportError:
+        _shared_db_instance = None
+    if _shared_db_instance is None:
+        return database.PhotoDatabase()
+    return _shared_db_instance
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the database and services when the server starts.
+
+    Construction happens here rather than at import time so that importing
+    the module (reloader, worker processes, tests) does not open database
+    handles. The database is a process-wide singleton shared with the CLI,
+    so it is left open on shutdown.
+
+    Args:
+        app: The FastAPI application
+    """
+    db = _get_database()
+    app.state.db = db
+    app.state.thumbnail_service = thumbnail_service.ThumbnailService()
+    app.state.library_indexer = library_indexer.LibraryIndexer(db=db)
+    app.state.tag_manager = tag_manager.TagManager(db_path=db.db_path)
+    app.state.album_manager = album_manager.AlbumManager(db_path=db.db_path)
+    app.state.duplicate_detector = duplicate_detection_service.DuplicateDetectionService(db=db)
+    yield
+
+
 # Create the FastAPI application
 app = FastAPI(
     title="Pixels API",
@@ -28,6 +79,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware to allow communication with the Flutter app
@@ -39,23 +91,30 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-# Initialize database and services - reuse database instance from main.py if available
-try:
-    # Try to use an existing database instance if one is already initialized
-    from .. import _shared_db_instance
 
-    db = _shared_db_instance
-    if db is None:
-        db = database.PhotoDatabase()
-except (ImportError, AttributeError):
-    # If no shared instance exists, create a new one
-    db = database.PhotoDatabase()
+# Dependency providers for the services created in lifespan
+async def get_db(request: Request) -> database.PhotoDatabase:
+    return request.app.state.db
+
+
+async def get_thumbnail_service(request: Request) -> thumbnail_service.ThumbnailService:
+    return request.app.state.thumbnail_service
+
+
+async def get_library_indexer(request: Request) -> library_indexer.LibraryIndexer:
+    return request.app.state.library_indexer
+
+
+async def get_tag_manager(request: Request) -> tag_manager.TagManager:
+    return request.app.state.tag_manager
 
-thumbnail_service = thumbnail_service.ThumbnailService()
-library_indexer = library_indexer.LibraryIndexer(db, thumbnail_service)
-tag_manager = tag_manager.TagManager(db_path=db.db_path)
-album_manager = album_manager.AlbumManager(db_path=db.db_path)
-duplicate_detector = duplicate_detection_service.DuplicateDetectionService(db_path=db.db_path)
+
+async def get_album_manager(request: Request) -> album_manager.AlbumManager:
+    return request.app.state.album_manager
+
+
+async def get_duplicate_detector(request: Request) -> duplicate_detection_service.DuplicateDetectionService:
+    return request.app.state.duplicate_detector
 
 
 # Define Pydantic models for request/response validation
@@ -83,7 +142,8 @@ class FolderResponse(FolderBase):
     children: Optional[List['FolderResponse']] = None
 
 
-class PhotoResponse(BaseModel):
+class PhotoListItem(BaseModel):
+    """Slim photo model used by list endpoints."""
     id: int
     file_name: str
     file_path: str
@@ -92,11 +152,15 @@ class PhotoResponse(BaseModel):
     width: Optional[int] = None
     height: Optional[int] = None
     date_taken: Optional[datetime.datetime] = None
-    camera_make: Optional[str] = None
-    camera_model: Optional[str] = None
     rating: Optional[int] = 0
     is_favorite: bool = False
     thumbnail_path: Optional[str] = None
+
+
+class PhotoResponse(PhotoListItem):
+    """Full photo model returned for a single photo."""
+    camera_make: Optional[str] = None
+    camera_model: Optional[str] = None
     tags: Optional[List['TagResponse']] = None
     albums: Optional[List['AlbumResponse']] = None
 
@@ -159,6 +223,12 @@ class DuplicateActionRequest(BaseModel):
     action: str = "trash"  # Options: "trash", "delete", "keep"
 
 
+class BootstrapResponse(BaseModel):
+    folders: List[FolderResponse]
+    albums: List[AlbumResponse]
+    tags: List[TagResponse]
+
+
 class SearchParams(BaseModel):
     keyword: Optional[str] = None
     folder_ids: Optional[List[int]] = None
@@ -174,6 +244,47 @@ class SearchParams(BaseModel):
     sort_desc: bool = True
 
 
+@lru_cache(maxsize=THUMBNAIL_CACHE_SIZE)
+def _thumbnail_bytes(thumbnail_path: str, mtime_ns: int) -> bytes:
+    """
+    Read a thumbnail file, keeping recently served thumbnails in memory.
+
+    Args:
+        thumbnail_path: Path to the thumbnail file
+        mtime_ns: Modification time of the file, so a regenerated
+            thumbnail is not served from a stale cache entry
+
+    Returns:
+        Contents of the thumbnail file
+    """
+    with open(thumbnail_path, "rb") as f:
+        return f.read()
+
+
+def _apply_tag_counts(tags: List[dict], counts: dict) -> None:
+    """Set photo_count on each tag (and nested children) from a count lookup."""
+    for tag in tags:
+        tag["photo_count"] = counts.get(tag["id"], 0)
+        if tag.get("children"):
+            _apply_tag_counts(tag["children"], counts)
+
+
+def _tags_with_counts(db: database.PhotoDatabase, hierarchy: bool) -> List[dict]:
+    """Load all tags with their photo counts."""
+    tags = db.get_tag_hierarchy() if hierarchy else db.get_all_tags()
+    _apply_tag_counts(tags, db.get_tag_photo_counts())
+    return tags
+
+
+def _albums_with_counts(db: database.PhotoDatabase) -> List[dict]:
+    """Load all albums with their photo counts."""
+    albums = db.get_all_albums()
+    counts = db.get_album_photo_counts()
+    for album in albums:
+        album["photo_count"] = counts.get(album["id"], 0)
+    return albums
+
+
 # Helper functions for serialization
 def serialize_datetime(obj):
     """JSON serializer for datetime objects."""
@@ -197,9 +308,28 @@ def shutdown():
     sys.exit(0)
 
 
+@app.get("/api/bootstrap", response_model=BootstrapResponse, tags=["health"])
+async def bootstrap(db: database.PhotoDatabase = Depends(get_db)):
+    """
+    Get the folders, albums and tag hierarchy needed at client start-up.
+
+    The three queries run concurrently on worker threads and are returned
+    in a single response.
+    """
+    folders, albums, tags = await asyncio.gather(
+        asyncio.to_thread(db.get_all_folders),
+        asyncio.to_thread(_albums_with_counts, db),
+        asyncio.to_thread(_tags_with_counts, db, True),
+    )
+    return {"folders": folders, "albums": albums, "tags": tags}
+
+
 # Folder endpoints
 @app.get("/api/folders", response_model=List[FolderResponse], tags=["folders"])
-def get_folders(hierarchy: bool = False):
+def get_folders(
+        hierarchy: bool = False,
+        db: database.PhotoDatabase = Depends(get_db)
+):
     """
     Get all folders or folder hierarchy.
     
@@ -214,7 +344,10 @@ def get_folders(hierarchy: bool = False):
 
 
 @app.get("/api/folders/{folder_id}", response_model=FolderResponse, tags=["folders"])
-def get_folder(folder_id: int = PathParam(..., description="ID of the folder to retrieve")):
+def get_folder(
+        folder_id: int = PathParam(..., description="ID of the folder to retrieve"),
+        db: database.PhotoDatabase = Depends(get_db)
+):
     """
     Get a specific folder by ID.
     
@@ -228,12 +361,21 @@ def get_folder(folder_id: int = PathParam(..., description="ID of the folder to
 
 
 @app.post("/api/folders", response_model=FolderResponse, status_code=201, tags=["folders"])
-def create_folder(folder: FolderCreate):
+def create_folder(
+        folder: FolderCreate,
+        background_tasks: BackgroundTasks,
+        db: database.PhotoDatabase = Depends(get_db),
+        library_indexer: library_indexer.LibraryIndexer = Depends(get_library_indexer)
+):
     """
-    Create a new folder and index its contents.
-    
+    Create a new folder and schedule indexing of its contents.
+
+    Indexing runs as a background task after the response has been sent,
+    so the request returns as soon as the folder record exists.
+
     Args:
         folder: Folder details
+        background_tasks: FastAPI background task queue
     """
     # First check if folder exists in file system
     if not os.path.exists(folder.path):
@@ -247,9 +389,9 @@ def create_folder(folder: FolderCreate):
         is_monitored=folder.is_monitored
     )
 
-    # Index the folder if it was successfully added
+    # Index the folder in the background if it was successfully added
     if folder_id and folder.is_monitored:
-        library_indexer.index_folder(folder_id)
+        background_tasks.add_task(library_indexer.index_folder, folder.path, monitor=True)
 
     # Return the created folder
     created_folder = db.get_folder(folder_id)
@@ -259,7 +401,10 @@ def create_folder(folder: FolderCreate):
 
 
 @app.delete("/api/folders/{folder_id}", tags=["folders"])
-def delete_folder(folder_id: int = PathParam(..., description="ID of the folder to delete")):
+def delete_folder(
+        folder_id: int = PathParam(..., description="ID of the folder to delete"),
+        db: database.PhotoDatabase = Depends(get_db)
+):
     """
     Delete a folder from the database (does not delete from filesystem).
     
@@ -279,14 +424,20 @@ def delete_folder(folder_id: int = PathParam(..., description="ID of the folder
 
 
 # Photo endpoints
-@app.get("/api/photos/folder/{folder_id}", response_model=List[PhotoResponse], tags=["photos"])
+@app.get("/api/photos/folder/{folder_id}", response_model=List[PhotoListItem], tags=["photos"])
 def get_photos_in_folder(
+        response: Response,
         folder_id: int = PathParam(..., description="ID of the folder to get photos from"),
         limit: int = Query(100, description="Maximum number of photos to return"),
-        offset: int = Query(0, description="Number of photos to skip")
+        offset: int = Query(0, description="Number of photos to skip"),
+        db: database.PhotoDatabase = Depends(get_db)
 ):
     """
     Get all photos in a specific folder.
+
+    The first thumbnails are advertised in a ``Link: rel=preload`` header so
+    the client (or an HTTP/2 proxy in front of the server) can start
+    fetching them before the JSON body has been parsed.
     
     Args:
         folder_id: ID of the folder
@@ -294,11 +445,19 @@ def get_photos_in_folder(
         offset: Number of photos to skip
     """
     photos = db.search_photos(folder_ids=[folder_id], limit=limit, offset=offset)
+    if photos:
+        response.headers["Link"] = ", ".join(
+            f"</api/thumbnails/{photo['id']}>; rel=preload; as=image"
+            for photo in photos[:PRELOAD_THUMBNAIL_COUNT]
+        )
     return photos
 
 
 @app.get("/api/photos/{photo_id}", response_model=PhotoResponse, tags=["photos"])
-def get_photo(photo_id: int = PathParam(..., description="ID of the photo to retrieve")):
+def get_photo(
+        photo_id: int = PathParam(..., description="ID of the photo to retrieve"),
+        db: database.PhotoDatabase = Depends(get_db)
+):
     """
     Get a specific photo by ID.
     
@@ -319,7 +478,8 @@ def get_photo(photo_id: int = PathParam(..., description="ID of the photo to ret
 @app.patch("/api/photos/{photo_id}", response_model=PhotoResponse, tags=["photos"])
 def update_photo(
         photo_update: PhotoUpdate,
-        photo_id: int = PathParam(..., description="ID of the photo to update")
+        photo_id: int = PathParam(..., description="ID of the photo to update"),
+        db: database.PhotoDatabase = Depends(get_db)
 ):
     """
     Update photo properties (rating, favorite status).
@@ -350,7 +510,7 @@ def update_photo(
         raise HTTPException(status_code=500, detail="Failed to update photo")
 
 
-@app.get("/api/photos/search", response_model=List[PhotoResponse], tags=["photos"])
+@app.get("/api/photos/search", response_model=List[PhotoListItem], tags=["photos"])
 def search_photos(
         keyword: Optional[str] = Query(None, description="Search text"),
         folder_ids: Optional[str] = Query(None, description="Comma-separated folder IDs"),
@@ -363,7 +523,8 @@ def search_photos(
         limit: int = Query(100, description="Maximum number of results"),
         offset: int = Query(0, description="Offset for pagination"),
         sort_by: str = Query("date_taken", description="Field to sort by"),
-        sort_desc: bool = Query(True, description="Sort in descending order")
+        sort_desc: bool = Query(True, description="Sort in descending order"),
+        db: database.PhotoDatabase = Depends(get_db)
 ):
     """
     Search photos with various filters.
@@ -418,13 +579,18 @@ def search_photos(
 
 # Album endpoints
 @app.get("/api/albums", response_model=List[AlbumResponse], tags=["albums"])
-def get_all_albums():
+def get_all_albums(
+        album_manager: album_manager.AlbumManager = Depends(get_album_manager)
+):
     """Get all albums."""
     return album_manager.get_all_albums()
 
 
 @app.get("/api/albums/{album_id}", response_model=AlbumResponse, tags=["albums"])
-def get_album(album_id: int = PathParam(..., description="ID of the album to retrieve")):
+def get_album(
+        album_id: int = PathParam(..., description="ID of the album to retrieve"),
+        album_manager: album_manager.AlbumManager = Depends(get_album_manager)
+):
     """
     Get a specific album by ID.
     
@@ -438,7 +604,10 @@ def get_album(album_id: int = PathParam(..., description="ID of the album to ret
 
 
 @app.post("/api/albums", response_model=AlbumResponse, status_code=201, tags=["albums"])
-def create_album(album: AlbumCreate):
+def create_album(
+        album: AlbumCreate,
+        album_manager: album_manager.AlbumManager = Depends(get_album_manager)
+):
     """
     Create a new album.
     
@@ -454,7 +623,8 @@ def create_album(album: AlbumCreate):
 @app.put("/api/albums/{album_id}", response_model=AlbumResponse, tags=["albums"])
 def update_album(
         album_update: AlbumBase,
-        album_id: int = PathParam(..., description="ID of the album to update")
+        album_id: int = PathParam(..., description="ID of the album to update"),
+        album_manager: album_manager.AlbumManager = Depends(get_album_manager)
 ):
     """
     Update an album's name and description.
@@ -477,7 +647,10 @@ def update_album(
 
 
 @app.delete("/api/albums/{album_id}", tags=["albums"])
-def delete_album(album_id: int = PathParam(..., description="ID of the album to delete")):
+def delete_album(
+        album_id: int = PathParam(..., description="ID of the album to delete"),
+        album_manager: album_manager.AlbumManager = Depends(get_album_manager)
+):
     """
     Delete an album.
     
@@ -496,8 +669,11 @@ def delete_album(album_id: int = PathParam(..., description="ID of the album to
         raise HTTPException(status_code=500, detail="Failed to delete album")
 
 
-@app.get("/api/albums/{album_id}/photos", response_model=List[PhotoResponse], tags=["albums"])
-def get_photos_in_album(album_id: int = PathParam(..., description="ID of the album")):
+@app.get("/api/albums/{album_id}/photos", response_model=List[PhotoListItem], tags=["albums"])
+def get_photos_in_album(
+        album_id: int = PathParam(..., description="ID of the album"),
+        album_manager: album_manager.AlbumManager = Depends(get_album_manager)
+):
     """
     Get all photos in a specific album.
     
@@ -518,7 +694,9 @@ def get_photos_in_album(album_id: int = PathParam(..., description="ID of the al
 def add_photo_to_album(
         relation: PhotoAlbumRelation,
         album_id: int = PathParam(..., description="ID of the album"),
-        photo_id: int = PathParam(..., description="ID of the photo to add")
+        photo_id: int = PathParam(..., description="ID of the photo to add"),
+        db: database.PhotoDatabase = Depends(get_db),
+        album_manager: album_manager.AlbumManager = Depends(get_album_manager)
 ):
     """
     Add a photo to an album.
@@ -553,7 +731,8 @@ def add_photo_to_album(
 @app.delete("/api/albums/{album_id}/photos/{photo_id}", tags=["albums"])
 def remove_photo_from_album(
         album_id: int = PathParam(..., description="ID of the album"),
-        photo_id: int = PathParam(..., description="ID of the photo to remove")
+        photo_id: int = PathParam(..., description="ID of the photo to remove"),
+        album_manager: album_manager.AlbumManager = Depends(get_album_manager)
 ):
     """
     Remove a photo from an album.
@@ -576,27 +755,25 @@ def remove_photo_from_album(
 
 # Tag endpoints
 @app.get("/api/tags", response_model=List[TagResponse], tags=["tags"])
-def get_all_tags(hierarchy: bool = Query(False, description="Return tags in a hierarchical structure")):
+def get_all_tags(
+        hierarchy: bool = Query(False, description="Return tags in a hierarchical structure"),
+        db: database.PhotoDatabase = Depends(get_db)
+):
     """
     Get all tags or tag hierarchy.
     
     Args:
         hierarchy: If True, return tags in a hierarchical structure
     """
-    if hierarchy:
-        tags = db.get_tag_hierarchy()
-    else:
-        tags = db.get_all_tags()
-
-    # Add photo counts to each tag
-    for tag in tags:
-        tag["photo_count"] = len(db.get_photos_by_tag(tag["id"], limit=1000))
-
-    return tags
+    return _tags_with_counts(db, hierarchy)
 
 
 @app.post("/api/tags", response_model=TagResponse, status_code=201, tags=["tags"])
-def create_tag(tag: TagCreate):
+def create_tag(
+        tag: TagCreate,
+        db: database.PhotoDatabase = Depends(get_db),
+        tag_manager: tag_manager.TagManager = Depends(get_tag_manager)
+):
     """
     Create a new tag.
     
@@ -615,7 +792,8 @@ def create_tag(tag: TagCreate):
 @app.put("/api/tags/{tag_id}", response_model=TagResponse, tags=["tags"])
 def update_tag(
         tag_update: TagBase,
-        tag_id: int = PathParam(..., description="ID of the tag to update")
+        tag_id: int = PathParam(..., description="ID of the tag to update"),
+        db: database.PhotoDatabase = Depends(get_db)
 ):
     """
     Update a tag's name and parent.
@@ -639,7 +817,10 @@ def update_tag(
 
 
 @app.delete("/api/tags/{tag_id}", tags=["tags"])
-def delete_tag(tag_id: int = PathParam(..., description="ID of the tag to delete")):
+def delete_tag(
+        tag_id: int = PathParam(..., description="ID of the tag to delete"),
+        db: database.PhotoDatabase = Depends(get_db)
+):
     """
     Delete a tag.
     
@@ -658,11 +839,12 @@ def delete_tag(tag_id: int = PathParam(..., description="ID of the tag to delete
         raise HTTPException(status_code=500, detail="Failed to delete tag")
 
 
-@app.get("/api/tags/{tag_id}/photos", response_model=List[PhotoResponse], tags=["tags"])
+@app.get("/api/tags/{tag_id}/photos", response_model=List[PhotoListItem], tags=["tags"])
 def get_photos_by_tag(
         tag_id: int = PathParam(..., description="ID of the tag"),
         limit: int = Query(100, description="Maximum number of photos to return"),
-        offset: int = Query(0, description="Number of photos to skip")
+        offset: int = Query(0, description="Number of photos to skip"),
+        db: database.PhotoDatabase = Depends(get_db)
 ):
     """
     Get all photos with a specific tag.
@@ -685,7 +867,8 @@ def get_photos_by_tag(
 @app.put("/api/photos/{photo_id}/tags/{tag_id}", tags=["tags"])
 def add_tag_to_photo(
         photo_id: int = PathParam(..., description="ID of the photo"),
-        tag_id: int = PathParam(..., description="ID of the tag to add")
+        tag_id: int = PathParam(..., description="ID of the tag to add"),
+        db: database.PhotoDatabase = Depends(get_db)
 ):
     """
     Add a tag to a photo.
@@ -713,7 +896,8 @@ def add_tag_to_photo(
 @app.delete("/api/photos/{photo_id}/tags/{tag_id}", tags=["tags"])
 def remove_tag_from_photo(
         photo_id: int = PathParam(..., description="ID of the photo"),
-        tag_id: int = PathParam(..., description="ID of the tag to remove")
+        tag_id: int = PathParam(..., description="ID of the tag to remove"),
+        db: database.PhotoDatabase = Depends(get_db)
 ):
     """
     Remove a tag from a photo.
@@ -741,8 +925,11 @@ def remove_tag_from_photo(
 # Thumbnail endpoints
 @app.get("/api/thumbnails/{photo_id}", tags=["thumbnails"])
 def get_thumbnail(
+        request: Request,
         photo_id: int = PathParam(..., description="ID of the photo"),
-        size: str = Query("sm", description="Size of thumbnail (sm, md, lg)")
+        size: str = Query("sm", description="Size of thumbnail (sm, md, lg)"),
+        db: database.PhotoDatabase = Depends(get_db),
+        thumbnail_service: thumbnail_service.ThumbnailService = Depends(get_thumbnail_service)
 ):
     """
     Get a thumbnail for a photo.
@@ -757,27 +944,41 @@ def get_thumbnail(
         raise HTTPException(status_code=404, detail="Photo not found")
 
     # Get or generate thumbnail
-    thumbnail_path = thumbnail_service.get_thumbnail(photo_id, size)
+    thumbnail_path = thumbnail_service.get_cached_thumbnail(photo["file_path"], size)
 
-    if not thumbnail_path or not os.path.exists(thumbnail_path):
+    if not thumbnail_path:
         # Fallback to generating thumbnail
-        thumbnail_path = thumbnail_service.generate_thumbnail(photo["file_path"], photo_id, size)
+        thumbnail_path = thumbnail_service.generate_thumbnail(photo["file_path"], size)
 
-    if thumbnail_path and os.path.exists(thumbnail_path):
-        return FileResponse(thumbnail_path)
+    if thumbnail_path:
+        try:
+            stat = os.stat(thumbnail_path)
+            headers = {
+                "ETag": f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+                "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+                "Cache-Control": f"public, max-age={THUMBNAIL_MAX_AGE}",
+            }
+            if request.headers.get("if-none-match") == headers["ETag"]:
+                return Response(status_code=304, headers=headers)
+            return Response(_thumbnail_bytes(thumbnail_path, stat.st_mtime_ns), media_type="image/jpeg",
+                            headers=headers)
+        except OSError:
+            pass
+
+    # Return a placeholder image
+    placeholder_path = os.path.join(os.path.dirname(__file__), "../../assets/placeholder.png")
+    if os.path.exists(placeholder_path):
+        return FileResponse(placeholder_path)
     else:
-        # Return a placeholder image
-        placeholder_path = os.path.join(os.path.dirname(__file__), "../../assets/placeholder.png")
-        if os.path.exists(placeholder_path):
-            return FileResponse(placeholder_path)
-        else:
-            raise HTTPException(status_code=404, detail="Thumbnail not found")
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
 
 
 # Duplicate detection endpoints
 @app.get("/api/duplicates", response_model=List[DuplicateGroupResponse], tags=["duplicates"])
 def find_duplicates(
-        folder_id: Optional[int] = Query(None, description="Find duplicates only in a specific folder")
+        folder_id: Optional[int] = Query(None, description="Find duplicates only in a specific folder"),
+        db: database.PhotoDatabase = Depends(get_db),
+        duplicate_detector: duplicate_detection_service.DuplicateDetectionService = Depends(get_duplicate_detector)
 ):
     """
     Find duplicate photos based on file hash.
@@ -801,13 +1002,18 @@ def find_duplicates(
 
 
 @app.get("/api/duplicates/statistics", response_model=DuplicateStatistics, tags=["duplicates"])
-def get_duplicate_statistics():
+def get_duplicate_statistics(
+        duplicate_detector: duplicate_detection_service.DuplicateDetectionService = Depends(get_duplicate_detector)
+):
     """Get statistics about duplicates in the library."""
     return duplicate_detector.get_duplicate_statistics()
 
 
 @app.put("/api/duplicates/suggest", response_model=List[int], tags=["duplicates"])
-def suggest_duplicates_to_keep(group: DuplicateGroupResponse):
+def suggest_duplicates_to_keep(
+        group: DuplicateGroupResponse,
+        duplicate_detector: duplicate_detection_service.DuplicateDetectionService = Depends(get_duplicate_detector)
+):
     """
     Suggest which photos to keep from a group of duplicates.
     
@@ -830,7 +1036,11 @@ def suggest_duplicates_to_keep(group: DuplicateGroupResponse):
 
 
 @app.post("/api/duplicates/action", tags=["duplicates"])
-def perform_duplicate_action(action_request: DuplicateActionRequest):
+def perform_duplicate_action(
+        action_request: DuplicateActionRequest,
+        db: database.PhotoDatabase = Depends(get_db),
+        duplicate_detector: duplicate_detection_service.DuplicateDetectionService = Depends(get_duplicate_detector)
+):
     """
     Perform an action on duplicate photos.
     
@@ -845,11 +1055,11 @@ def perform_duplicate_action(action_request: DuplicateActionRequest):
     if action_request.action not in valid_actions:
         raise HTTPException(status_code=400, detail=f"Invalid action. Must be one of: {', '.join(valid_actions)}")
 
-    # For each photo ID, perform the requested action
+    # Look the photos up in one batch, then perform the requested action on each
+    photos = db.get_photos(action_request.photo_ids)
     results = []
     for photo_id in action_request.photo_ids:
-        photo = db.get_photo(photo_id)
-        if not photo:
+        if photo_id not in photos:
             results.append({"photo_id": photo_id, "success": False, "message": "Photo not found"})
             continue
 
@@ -879,7 +1089,8 @@ def perform_duplicate_action(action_request: DuplicateActionRequest):
 
 @app.post("/api/duplicates/scan", tags=["duplicates"])
 def scan_folder_for_duplicates(
-        folder_path: str = Query(..., description="Path to scan for duplicates")
+        folder_path: str = Query(..., description="Path to scan for duplicates"),
+        duplicate_detector: duplicate_detection_service.DuplicateDetectionService = Depends(get_duplicate_detector)
 ):
     """
     Scan a folder for images, index them, and find duplicates.
@@ -904,4 +1115,5 @@ def scan_folder_for_duplicates(
             "statistics": stats
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error scanning folder: {str(e)}")
+        logger.error("Error scanning folder %s for duplicates: %s", folder_path, e)
+        raise HTTPException(status_code=500, detail=f"Error scanning folder: {e}")
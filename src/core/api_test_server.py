@@ -1,17 +1,19 @@
-import glob
+import asyncio
 import logging
 import os
-import time
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import uvicorn
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Query
+from fastapi import BackgroundTasks, Body, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel, Field
+from fastapi.responses import HTMLResponse, ORJSONResponse
+from pydantic import BaseModel
 
 # Setup logging
 logging.basicConfig(
@@ -20,11 +22,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger("pixels-tester")
 
+# Number of server worker processes started by uvicorn
+SERVER_WORKERS = int(os.environ.get("PIXELS_TESTER_WORKERS", "1"))
+
+# Directory walks are pure Python, so they run in worker processes to
+# spread across cores instead of contending for the GIL; the cores are
+# shared between the server workers. Created by the app's lifespan; while
+# it is None, walks fall back to the event loop's default thread pool.
+_count_pool: Optional[ProcessPoolExecutor] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the directory walk process pool, and shut it down on exit."""
+    global _count_pool
+    _count_pool = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 1) // SERVER_WORKERS))
+    try:
+        yield
+    finally:
+        pool, _count_pool = _count_pool, None
+        pool.shutdown(cancel_futures=True)
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Pixels Python Tester",
     description="Test interface for Pixels photo management functions",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Enable CORS for frontend access
@@ -52,145 +78,423 @@ class ScanType(str, Enum):
     SELECTED = "selected"
 
 
-# Mock database - in a real app, you'd connect to your actual database
-folders_db = {}
-next_folder_id = 1
+# Folder store shared by all server workers; WAL lets readers and the writer overlap
+DB_PATH = os.environ.get("PIXELS_TESTER_DB", "pixels_tester.db")
+_db_conn = None
+_db_lock = threading.Lock()
+# Folder ID -> (directory mtimes, photo count) from the last walk of that folder
+_scan_cache = {}
+
+# Artificial delay in seconds added to folder scans, for exercising the UI's
+# loading states; off unless PIXELS_SIMULATE_SCAN_DELAY is set
+_SIMULATE_DELAY = float(os.environ.get("PIXELS_SIMULATE_SCAN_DELAY", "0"))
+
+# Maximum number of folder walks running at once, to cap open directory handles
+MAX_CONCURRENT_SCANS = 4
+_scan_semaphore = asyncio.BoundedSemaphore(MAX_CONCURRENT_SCANS)
+
+
+# File extensions counted as photos
+_PHOTO_EXTS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
+# Extension bodies split by length, so the walker checks one small set
+_PHOTO_SUFFIX3 = frozenset(ext[1:] for ext in _PHOTO_EXTS if len(ext) == 4)
+_PHOTO_SUFFIX4 = frozenset(ext[1:] for ext in _PHOTO_EXTS if len(ext) == 5)
+# Last characters of the extensions above in either case; most non-photo
+# names fail this check without any string being lowercased
+_PHOTO_EXT_LAST_CHARS = frozenset(ext[-1] for ext in _PHOTO_EXTS) | frozenset(ext[-1].upper() for ext in _PHOTO_EXTS)
 
 
 # Mock backend functions
-def get_folders():
-    return list(folders_db.values())
+def _count_photos(root: str, max_depth: int = 16, same_fs: bool = True) -> Tuple[int, Dict[str, int]]:
+    """
+    Count photo files under a directory tree.
+
+    Walks the tree with an explicit stack of os.scandir calls, using the
+    entry type reported by the directory listing so no file is stat'ed.
+    Unreadable subdirectories are skipped; errors opening the root itself
+    propagate to the caller.
+
+    Keep the loop to os.scandir and DirEntry methods only (no os.path.isdir,
+    isfile or exists): on Windows DirEntry answers is_dir, is_file and stat
+    from the FindFirstFileExW/FindNextFileW enumeration data, so each
+    directory costs one enumeration rather than a CreateFileW per entry.
+
+    Scanning a whole drive or "/" must not wander into pseudo filesystems
+    (/proc, /sys), network mounts or directory loops, so the walk stops at
+    max_depth levels below the root, optionally stays on the root's device,
+    and never enters the same (device, inode) directory twice.
+
+    Args:
+        root: Directory to count photos under
+        max_depth: Deepest directory level below root that is walked
+        same_fs: Skip directories on a different device than root
+
+    Returns:
+        The photo count, and the mtime_ns of every directory in the tree
+        so a later scan can tell whether anything changed
+    """
+    count = 0
+    root_stat = os.stat(root)
+    root_dev = root_stat.st_dev
+    dir_mtimes = {root: root_stat.st_mtime_ns}
+    seen_dirs = {(root_dev, root_stat.st_ino)}
+    stack = [(root, 0)]
+    while stack:
+        directory, depth = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            if directory is root:
+                raise
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if depth >= max_depth:
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                    # DirEntry.stat() on Windows leaves st_dev as 0; treat that as the root's device
+                    dev = st.st_dev or root_dev
+                    if same_fs and dev != root_dev:
+                        continue
+                    key = (dev, entry.inode())
+                    if key in seen_dirs:
+                        continue
+                    seen_dirs.add(key)
+                    dir_mtimes[entry.path] = st.st_mtime_ns
+                    stack.append((entry.path, depth + 1))
+                elif entry.is_file(follow_symlinks=False):
+                    # Lowercase only the suffix, never the whole name
+                    name = entry.name
+                    if name[-1] not in _PHOTO_EXT_LAST_CHARS:
+                        continue
+                    dot = name.rfind('.')
+                    if dot < 0:
+                        continue
+                    tail_len = len(name) - dot - 1
+                    if tail_len == 3:
+                        if name[dot + 1:].lower() in _PHOTO_SUFFIX3:
+                            count += 1
+                    elif tail_len == 4 and name[dot + 1:].lower() in _PHOTO_SUFFIX4:
+                        count += 1
+    return count, dir_mtimes
+
+
+async def _count_photos_in_pool(root: str) -> Tuple[int, Dict[str, int]]:
+    """Run _count_photos in the process pool without blocking the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_count_pool, _count_photos, root)
+
+
+def _tree_unchanged(dir_mtimes: Dict[str, int]) -> bool:
+    """
+    Check whether any directory recorded by _count_photos has changed.
+
+    Adding, removing or renaming an entry updates its parent directory's
+    mtime, so one stat per directory is enough; no directory is listed.
+    """
+    try:
+        return all(os.stat(path).st_mtime_ns == mtime for path, mtime in dir_mtimes.items())
+    except OSError:
+        return False
+
+
+def _list_drives() -> List[str]:
+    """
+    List the root of every mounted drive.
+
+    On Windows the drive bitmask from GetLogicalDrives is decoded in a
+    single call rather than probing all 26 letters on disk.
+    """
+    if os.name != 'nt':  # Unix-like
+        return ["/"]
+
+    import ctypes
+    mask = ctypes.windll.kernel32.GetLogicalDrives()
+    return [f"{chr(ord('A') + i)}:\\" for i in range(26) if mask & (1 << i)]
+
+
+def _get_db() -> sqlite3.Connection:
+    """Open the folder store on first use. Callers must hold _db_lock."""
+    global _db_conn
+    if _db_conn is None:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS folders ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "path TEXT NOT NULL, "
+            "normalized TEXT NOT NULL UNIQUE, "
+            "name TEXT NOT NULL, "
+            "photo_count INTEGER NOT NULL DEFAULT 0, "
+            "is_monitored INTEGER NOT NULL DEFAULT 1)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS scans ("
+            "id TEXT PRIMARY KEY, "
+            "folder_id INTEGER NOT NULL, "
+            "status TEXT NOT NULL, "
+            "photo_count INTEGER, "
+            "error TEXT)"
+        )
+        conn.commit()
+        _db_conn = conn
+    return _db_conn
+
+
+def _get_folder(folder_id: int) -> Folder:
+    with _db_lock:
+        row = _get_db().execute(
+            "SELECT id, name, path, photo_count, is_monitored FROM folders WHERE id = ?",
+            (folder_id,)
+        ).fetchone()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Folder with ID {folder_id} not found")
+    return Folder(**row)
 
 
-def add_folder(path: str, name: Optional[str] = None, is_monitored: bool = True):
-    global next_folder_id
+def get_folders():
+    with _db_lock:
+        rows = _get_db().execute(
+            "SELECT id, name, path, photo_count, is_monitored FROM folders ORDER BY id"
+        ).fetchall()
+    return [Folder(**row) for row in rows]
 
-    # Normalize path for cross-platform compatibility
-    normalized_path = os.path.normpath(path)
 
-    # Check if folder exists
-    if not os.path.exists(normalized_path):
-        raise HTTPException(status_code=400, detail=f"Folder not found: {normalized_path}")
+async def add_folder(path: str, name: Optional[str] = None, is_monitored: bool = True):
+    # Normalize path for cross-platform compatibility; the case-folded form
+    # is computed once here and is what duplicates are compared on
+    normalized_path = os.path.normpath(path)
+    canonical_path = os.path.normcase(normalized_path)
 
-    # Check if folder is already in the database
-    for folder in folders_db.values():
-        if os.path.normpath(folder.path) == normalized_path:
-            raise HTTPException(status_code=400, detail=f"Folder already exists in library: {normalized_path}")
+    # Check if folder is already in the database before walking it
+    with _db_lock:
+        exists = _get_db().execute(
+            "SELECT 1 FROM folders WHERE normalized = ?", (canonical_path,)
+        ).fetchone()
+    if exists:
+        raise HTTPException(status_code=400, detail=f"Folder already exists in library: {normalized_path}")
 
     # Use path basename if no name provided
     if name is None:
         name = os.path.basename(normalized_path) or normalized_path
 
-    # Count photos in directory
+    # Count photos in directory; this also tells us whether the folder exists
     try:
-        photo_count = len([f for f in glob.glob(os.path.join(normalized_path, "**/*.*"), recursive=True)
-                           if f.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.bmp'))])
+        photo_count, dir_mtimes = await _count_photos_in_pool(normalized_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=400, detail=f"Folder not found: {normalized_path}")
+    except NotADirectoryError:
+        raise HTTPException(status_code=400, detail=f"Not a folder: {normalized_path}")
     except Exception as e:
-        logger.error(f"Error counting photos in {normalized_path}: {str(e)}")
-        photo_count = 0
+        logger.error("Error counting photos in %s: %s", normalized_path, e)
+        photo_count, dir_mtimes = 0, None
+
+    # The UNIQUE index on the normalized path catches a folder added concurrently by another request or worker
+    try:
+        with _db_lock:
+            conn = _get_db()
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO folders (path, normalized, name, photo_count, is_monitored) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (normalized_path, canonical_path, name, photo_count, is_monitored)
+                )
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=400, detail=f"Folder already exists in library: {normalized_path}")
 
     folder = Folder(
-        id=next_folder_id,
+        id=cursor.lastrowid,
         name=name,
         path=normalized_path,
         photo_count=photo_count,
         is_monitored=is_monitored
     )
-
-    folders_db[next_folder_id] = folder
-    next_folder_id += 1
+    if dir_mtimes is not None:
+        _scan_cache[folder.id] = (dir_mtimes, photo_count)
 
     return folder
 
 
 def remove_folder(folder_id: int):
-    if folder_id not in folders_db:
+    with _db_lock:
+        conn = _get_db()
+        with conn:
+            cursor = conn.execute("DELETE FROM folders WHERE id = ?", (folder_id,))
+    if cursor.rowcount == 0:
         raise HTTPException(status_code=404, detail=f"Folder with ID {folder_id} not found")
 
-    del folders_db[folder_id]
+    _scan_cache.pop(folder_id, None)
     return {"success": True}
 
 
-def scan_folder(folder_id: int):
-    if folder_id not in folders_db:
-        raise HTTPException(status_code=404, detail=f"Folder with ID {folder_id} not found")
+async def scan_folder(folder_id: int):
+    folder = _get_folder(folder_id)
+
+    # Skip the walk if no directory in the tree changed since the last one
+    cached = _scan_cache.get(folder_id)
+    if cached is not None and await asyncio.to_thread(_tree_unchanged, cached[0]):
+        folder.photo_count = cached[1]
+        return folder
 
-    folder = folders_db[folder_id]
     # Simulate scanning by recounting files
     try:
-        photo_count = len([f for f in glob.glob(os.path.join(folder.path, "**/*.*"), recursive=True)
-                           if f.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.bmp'))])
-
+        photo_count, dir_mtimes = await _count_photos_in_pool(folder.path)
+        _scan_cache[folder_id] = (dir_mtimes, photo_count)
         folder.photo_count = photo_count
-        folders_db[folder_id] = folder
+        with _db_lock:
+            conn = _get_db()
+            with conn:
+                conn.execute("UPDATE folders SET photo_count = ? WHERE id = ?", (photo_count, folder_id))
     except Exception as e:
-        logger.error(f"Error scanning folder {folder.path}: {str(e)}")
+        logger.error("Error scanning folder %s: %s", folder.path, e)
         raise HTTPException(status_code=500, detail=f"Error scanning folder: {str(e)}")
 
     return folder
 
 
+def create_scan(folder_id: int) -> str:
+    """Record a new running scan of a folder and return its ID."""
+    scan_id = uuid.uuid4().hex
+    with _db_lock:
+        conn = _get_db()
+        with conn:
+            conn.execute(
+                "INSERT INTO scans (id, folder_id, status) VALUES (?, ?, 'running')",
+                (scan_id, folder_id)
+            )
+    return scan_id
+
+
+def finish_scan(scan_id: str, photo_count: Optional[int] = None, error: Optional[str] = None):
+    """Mark a scan as done with its photo count, or as failed with an error."""
+    status = "failed" if error is not None else "done"
+    with _db_lock:
+        conn = _get_db()
+        with conn:
+            conn.execute(
+                "UPDATE scans SET status = ?, photo_count = ?, error = ? WHERE id = ?",
+                (status, photo_count, error, scan_id)
+            )
+
+
+def get_scan(scan_id: str):
+    with _db_lock:
+        row = _get_db().execute(
+            "SELECT id AS scan_id, folder_id, status, photo_count, error FROM scans WHERE id = ?",
+            (scan_id,)
+        ).fetchone()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Scan {scan_id} not found")
+    return dict(row)
+
+
+async def run_scan(func, *args):
+    """Run a folder scan coroutine function, bounded by the scan semaphore."""
+    async with _scan_semaphore:
+        return await func(*args)
+
+
 # API Routes
-@app.get("/folders", response_model=List[Folder])
-def api_get_folders():
+@app.get("/folders")
+async def api_get_folders():
     """Get all folders in the library"""
     try:
         logger.info("Loading folders...")
         folders = get_folders()
-        logger.info(f"Loaded {len(folders)} folders")
-        return folders
+        logger.info("Loaded %d folders", len(folders))
+        # Hand plain dicts straight to orjson, bypassing FastAPI's encoder pass
+        return ORJSONResponse([folder.model_dump() for folder in folders])
     except Exception as e:
-        logger.error(f"Failed to load folders: {e}")
+        logger.error("Failed to load folders: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to load folders: {str(e)}")
 
 
-@app.post("/folders", response_model=Folder)
-def api_add_folder(path: str, name: Optional[str] = None, is_monitored: bool = True):
+@app.post("/folders")
+async def api_add_folder(path: str, name: Optional[str] = None, is_monitored: bool = True):
     """Add a new folder to the library"""
     try:
-        logger.info(f"Adding folder: {path} (name: {name})")
-        folder = add_folder(path, name, is_monitored)
-        logger.info(f"Added folder: ID={folder.id}, Name={folder.name}")
+        logger.info("Adding folder: %s (name: %s)", path, name)
+        folder = await run_scan(add_folder, path, name, is_monitored)
+        logger.info("Added folder: ID=%s, Name=%s", folder.id, folder.name)
         return folder
+    except HTTPException as e:
+        raise e
     except Exception as e:
-        logger.error(f"Failed to add folder: {e}")
+        logger.error("Failed to add folder: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to add folder: {str(e)}")
 
 
 @app.delete("/folders/{folder_id}")
-def api_remove_folder(folder_id: int):
+async def api_remove_folder(folder_id: int):
     """Remove a folder from the library"""
     try:
-        logger.info(f"Removing folder ID: {folder_id}")
+        logger.info("Removing folder ID: %s", folder_id)
         result = remove_folder(folder_id)
-        logger.info(f"Folder {folder_id} removed")
+        logger.info("Folder %s removed", folder_id)
         return result
     except HTTPException as e:
         raise e
     except Exception as e:
-        logger.error(f"Failed to remove folder: {e}")
+        logger.error("Failed to remove folder: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to remove folder: {str(e)}")
 
 
-@app.post("/folders/{folder_id}/scan", response_model=Folder)
-def api_scan_folder(folder_id: int, background_tasks: BackgroundTasks):
-    """Scan a folder to update photo count"""
+async def run_background_scan(scan_id: str, folder_id: int):
+    """Scan a folder after the response has been sent, recording the outcome on the scan"""
+    if _SIMULATE_DELAY:
+        await asyncio.sleep(_SIMULATE_DELAY)
     try:
-        logger.info(f"Scanning folder ID: {folder_id}")
-        # Simulate a time-consuming scanning process
-        time.sleep(1)
-        folder = scan_folder(folder_id)
-        logger.info(f"Folder {folder_id} scanned, found {folder.photo_count} photos")
-        return folder
+        folder = await run_scan(scan_folder, folder_id)
     except HTTPException as e:
-        raise e
+        finish_scan(scan_id, error=e.detail)
     except Exception as e:
-        logger.error(f"Failed to scan folder: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to scan folder: {str(e)}")
+        logger.error("Failed to scan folder %s: %s", folder_id, e)
+        finish_scan(scan_id, error=str(e))
+    else:
+        logger.info("Folder %s scanned, found %d photos", folder_id, folder.photo_count)
+        finish_scan(scan_id, photo_count=folder.photo_count)
+
+
+@app.post("/folders/{folder_id}/scan", status_code=202)
+async def api_scan_folder(folder_id: int, background_tasks: BackgroundTasks):
+    """Start scanning a folder to update its photo count; poll /scans/{scan_id} for the result"""
+    logger.info("Scanning folder ID: %s", folder_id)
+    _get_folder(folder_id)
+    scan_id = create_scan(folder_id)
+    background_tasks.add_task(run_background_scan, scan_id, folder_id)
+    return {"scan_id": scan_id, "folder_id": folder_id, "status": "running"}
+
+
+@app.get("/scans/{scan_id}")
+async def api_get_scan(scan_id: str):
+    """Get the status of a folder scan"""
+    return get_scan(scan_id)
+
+
+@app.post("/folders/scan_batch")
+async def api_scan_batch(folder_ids: List[int] = Body(...)):
+    """Scan several folders in one request, returning each folder or its error by ID"""
+    logger.info("Scanning %d folders", len(folder_ids))
+    if _SIMULATE_DELAY:
+        await asyncio.sleep(_SIMULATE_DELAY)
+    results = await asyncio.gather(*(run_scan(scan_folder, folder_id) for folder_id in folder_ids),
+                                   return_exceptions=True)
+
+    scanned = {}
+    for folder_id, result in zip(folder_ids, results):
+        if isinstance(result, HTTPException):
+            scanned[folder_id] = {"error": result.detail}
+        elif isinstance(result, Exception):
+            logger.error("Failed to scan folder %s: %s", folder_id, result)
+            scanned[folder_id] = {"error": str(result)}
+        else:
+            scanned[folder_id] = result
+    return scanned
 
 
 @app.post("/scan/{scan_type}")
-def api_scan_locations(scan_type: ScanType, path: Optional[str] = None):
+async def api_scan_locations(scan_type: ScanType, path: Optional[str] = None):
     """Scan common locations, system folders, or a selected folder"""
     try:
         if scan_type == ScanType.COMMON:
@@ -202,34 +506,33 @@ def api_scan_locations(scan_type: ScanType, path: Optional[str] = None):
                 os.path.join(home_dir, "Downloads"),
             ]
 
+            results = await asyncio.gather(*(run_scan(add_folder, loc) for loc in locations),
+                                           return_exceptions=True)
             added = []
-            for loc in locations:
-                if os.path.exists(loc):
-                    folder = add_folder(loc)
-                    added.append(folder)
+            for result in results:
+                if isinstance(result, HTTPException) and result.status_code == 400:
+                    continue
+                if isinstance(result, BaseException):
+                    raise result
+                added.append(result)
 
             return {"message": f"Added {len(added)} folders from common locations", "folders": added}
 
         elif scan_type == ScanType.SYSTEM:
             logger.info("Scanning system drives")
             # Simplified implementation
-            drives = []
-            if os.name == 'nt':  # Windows
-                import string
-                for letter in string.ascii_uppercase:
-                    drive = f"{letter}:\\"
-                    if os.path.exists(drive):
-                        drives.append(drive)
-            else:  # Unix-like
-                drives = ["/"]
+            drives = _list_drives()
 
+            results = await asyncio.gather(
+                *(run_scan(add_folder, drive, f"Drive {os.path.basename(drive) or 'Root'}") for drive in drives),
+                return_exceptions=True
+            )
             added = []
-            for drive in drives:
-                try:
-                    folder = add_folder(drive, f"Drive {os.path.basename(drive) or 'Root'}")
-                    added.append(folder)
-                except Exception as e:
-                    logger.error(f"Error adding drive {drive}: {e}")
+            for drive, result in zip(drives, results):
+                if isinstance(result, Exception):
+                    logger.error("Error adding drive %s: %s", drive, result)
+                else:
+                    added.append(result)
 
             return {"message": f"Added {len(added)} drives to library", "folders": added}
 
@@ -237,22 +540,17 @@ def api_scan_locations(scan_type: ScanType, path: Optional[str] = None):
             if not path:
                 raise HTTPException(status_code=400, detail="Path must be provided for selected folder scan")
 
-            logger.info(f"Adding selected folder: {path}")
-            folder = add_folder(path)
+            logger.info("Adding selected folder: %s", path)
+            folder = await run_scan(add_folder, path)
             return {"message": f"Added folder: {folder.name}", "folder": folder}
 
     except Exception as e:
-        logger.error(f"Failed to scan {scan_type} locations: {e}")
+        logger.error("Failed to scan %s locations: %s", scan_type, e)
         raise HTTPException(status_code=500, detail=f"Failed to scan locations: {str(e)}")
 
 
 # HTML interface to test the API - similar to Flutter UI but in web form
-templates = Jinja2Templates(directory="templates")
-
-# Create templates directory and HTML file
-os.makedirs("templates", exist_ok=True)
-with open("templates/index.html", "w") as f:
-    f.write("""
+INDEX_HTML = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -303,6 +601,7 @@ with open("templates/index.html", "w") as f:
     <div class="folder-list card">
         <h2>Folders</h2>
         <button class="action-btn" onclick="loadFolders()">Refresh Folders</button>
+        <button class="action-btn" onclick="scanAllFolders()">Scan All Folders</button>
         <div id="folders-container">Loading folders...</div>
     </div>
 
@@ -319,12 +618,16 @@ with open("templates/index.html", "w") as f:
             setTimeout(() => { statusEl.style.display = 'none'; }, 5000);
         }
         
+        // IDs of the folders currently listed
+        let folderIds = [];
+
         // Load folders
         async function loadFolders() {
             const container = document.getElementById('folders-container');
             try {
                 const response = await fetch('/folders');
                 const folders = await response.json();
+                folderIds = folders.map(folder => folder.id);
                 
                 if (folders.length === 0) {
                     container.innerHTML = '<p>No folders found.</p>';
@@ -410,18 +713,56 @@ with open("templates/index.html", "w") as f:
             }
         }
         
-        // Scan folder
+        // Scan folder, then poll the scan until it finishes
         async function scanFolder(id) {
             try {
                 showStatus('Scanning folder...');
                 const response = await fetch(`/folders/${id}/scan`, { method: 'POST' });
-                const data = await response.json();
+                let data = await response.json();
                 
-                if (response.ok) {
+                if (!response.ok) {
+                    showStatus(`Failed to scan folder: ${data.detail}`, true);
+                    return;
+                }
+
+                while (data.status === 'running') {
+                    await new Promise(resolve => setTimeout(resolve, 1000));
+                    data = await (await fetch(`/scans/${data.scan_id}`)).json();
+                }
+
+                if (data.status === 'done') {
                     showStatus(`Folder scanned, found ${data.photo_count} photos`);
                     loadFolders();
                 } else {
-                    showStatus(`Failed to scan folder: ${data.detail}`, true);
+                    showStatus(`Failed to scan folder: ${data.error}`, true);
+                }
+            } catch (error) {
+                showStatus(`Error: ${error.message}`, true);
+            }
+        }
+        
+        // Scan every listed folder in a single request
+        async function scanAllFolders() {
+            if (folderIds.length === 0) {
+                showStatus('No folders to scan', true);
+                return;
+            }
+
+            try {
+                showStatus('Scanning folders...');
+                const response = await fetch('/folders/scan_batch', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify(folderIds)
+                });
+                const data = await response.json();
+
+                if (response.ok) {
+                    const failed = Object.values(data).filter(result => result.error).length;
+                    showStatus(`Scanned ${folderIds.length - failed} folders` + (failed ? `, ${failed} failed` : ''), failed > 0);
+                    loadFolders();
+                } else {
+                    showStatus(`Failed to scan folders: ${data.detail}`, true);
                 }
             } catch (error) {
                 showStatus(`Error: ${error.message}`, true);
@@ -495,16 +836,28 @@ with open("templates/index.html", "w") as f:
     </script>
 </body>
 </html>
-    """)
+"""
 
 
-@app.get("/")
-async def serve_ui(request):
-    return templates.TemplateResponse("index.html", {"request": request})
+@app.get("/", response_class=HTMLResponse)
+async def serve_ui():
+    return HTMLResponse(INDEX_HTML)
 
 
 # Run the application
 if __name__ == "__main__":
     print("Starting Pixels Python Tester...")
     print("Visit http://127.0.0.1:8000 to test your Python code")
-    uvicorn.run("api_test_server:app", host="127.0.0.1", port=8000, reload=True)
+    # Workers share folders through the SQLite store; reload mode requires a
+    # single worker.
+    uvicorn.run(
+        "api_test_server:app",
+        host="127.0.0.1",
+        port=8000,
+        # "auto" picks uvloop and httptools when installed (they are not
+        # available on Windows) and falls back to asyncio/h11 otherwise
+        loop="auto",
+        http="auto",
+        workers=SERVER_WORKERS,
+        reload=SERVER_WORKERS == 1,
+    )
@@ -4,14 +4,38 @@ This module provides an enhanced CLI framework for testing and controlling the a
 """
 
 import argparse
+import itertools
+import json
 import logging
+import os
+import sys
 import time
-from typing import Dict, Any, List, Optional, Callable
-
-from src.core.feature_flags import get_feature_flags
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Dict, Any, List, Optional, Callable, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on threads used by the thumbnail generation test
+THUMBNAIL_TEST_WORKERS = 8
+
+# Extensions treated as images when picking files for the thumbnail test
+_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.webp', '.heic')
+
+
+@lru_cache(maxsize=1)
+def _indexer():
+    """LibraryIndexer shared by every command run in this process"""
+    from src.core.library_indexer import LibraryIndexer
+    return LibraryIndexer(db_path=None)  # The database path is already set in main.py
+
+
+@lru_cache(maxsize=1)
+def _db():
+    """PhotoDatabase shared by every command run in this process"""
+    from src.core.database import PhotoDatabase
+    return PhotoDatabase(db_path=None)  # The database path is already set in main.py
+
 
 # Add the missing function that is imported in main.py
 def process_cli_command(args):
@@ -25,15 +49,12 @@ def process_cli_command(args):
     try:
         # Handle the add-folder command
         if args.command == "add-folder":
-            from src.core.library_indexer import LibraryIndexer
-
-            # Initialize the library indexer with the database path
-            indexer = LibraryIndexer(db_path=None)  # The database path is already set in main.py
+            indexer = _indexer()
 
             # Add the folder to the library
             print(f"Adding folder: {args.path}")
-            monitor = args.monitor if hasattr(args, 'monitor') else False
-            name = args.name if hasattr(args, 'name') else None
+            monitor = getattr(args, 'monitor', False)
+            name = getattr(args, 'name', None)
 
             result = indexer.add_folder(args.path, name=name, monitor=monitor)
             if result:
@@ -45,10 +66,7 @@ def process_cli_command(args):
 
         # Handle the import command
         elif args.command == "import":
-            from src.core.library_indexer import LibraryIndexer
-
-            # Initialize the library indexer with the database path
-            indexer = LibraryIndexer(db_path=None)  # The database path is already set in main.py
+            indexer = _indexer()
 
             # Import photos from the folder
             print(f"Importing photos from: {args.path}")
@@ -58,40 +76,34 @@ def process_cli_command(args):
 
         # Handle the search command
         elif args.command == "search":
-            from src.core.database import PhotoDatabase
-
-            # Initialize the database
-            db = PhotoDatabase(db_path=None)  # The database path is already set in main.py
+            db = _db()
 
             # Build the search parameters
             search_params = {}
 
-            if hasattr(args, 'keyword') and args.keyword:
+            if getattr(args, 'keyword', None):
                 search_params['keyword'] = args.keyword
 
-            if hasattr(args, 'folder_id') and args.folder_id is not None:
+            if getattr(args, 'folder_id', None) is not None:
                 search_params['folder_ids'] = [args.folder_id]
 
                 # Check if recursive search is disabled
-                recursive = True
-                if hasattr(args, 'no_recursive') and args.no_recursive:
-                    recursive = False
-                search_params['recursive_folders'] = recursive
+                search_params['recursive_folders'] = not getattr(args, 'no_recursive', False)
 
-            if hasattr(args, 'tag_id') and args.tag_id is not None:
+            if getattr(args, 'tag_id', None) is not None:
                 search_params['tag_ids'] = [args.tag_id]
 
-            if hasattr(args, 'album_id') and args.album_id is not None:
+            if getattr(args, 'album_id', None) is not None:
                 search_params['album_id'] = args.album_id
 
-            if hasattr(args, 'min_rating') and args.min_rating is not None:
+            if getattr(args, 'min_rating', None) is not None:
                 search_params['min_rating'] = args.min_rating
 
-            if hasattr(args, 'favorites') and args.favorites:
+            if getattr(args, 'favorites', False):
                 search_params['is_favorite'] = True
 
             # Set the limit for results
-            limit = args.limit if hasattr(args, 'limit') else 10
+            limit = getattr(args, 'limit', 10)
             search_params['limit'] = limit
 
             # Perform the search
@@ -99,76 +111,14 @@ def process_cli_command(args):
 
             # Display the results
             print(f"Found {len(photos)} photos:")
-            for photo in photos:
-                print(f"  {photo['id']}: {photo['file_name']} ({photo['file_path']})")
+            sys.stdout.writelines(f"  {photo['id']}: {photo['file_name']} ({photo['file_path']})\n"
+                                  for photo in photos)
 
             return 0
 
         # Handle duplicates command
         elif args.command == "duplicates":
-            from src.core.duplicate_detection_service import DuplicateDetectionService
-
-            # Initialize the duplicate detection service
-            service = DuplicateDetectionService()
-
-            # Find duplicates
-            if hasattr(args, 'folder_id') and args.folder_id is not None:
-                print(f"Finding duplicates in folder {args.folder_id}...")
-                duplicates = service.find_duplicates_in_folder(args.folder_id)
-            else:
-                print("Finding duplicates across the entire library...")
-                duplicates = service.find_exact_duplicates()
-
-            if not duplicates:
-                print("No duplicate photos found.")
-                return 0
-
-            # Show statistics
-            stats = service.get_duplicate_statistics()
-            print(f"Found {stats['total_groups']} groups of duplicate photos:")
-            print(f"  Total duplicates: {stats['total_duplicates']}")
-            print(f"  Wasted space: {stats['wasted_space_mb']:.2f} MB")
-            print(f"  Largest duplicate group: {stats['largest_group_size']} photos")
-
-            # Display duplicates
-            if hasattr(args, 'verbose') and args.verbose:
-                for i, group in enumerate(duplicates):
-                    print(f"\nDuplicate group {i + 1} (hash: {group['file_hash']}):")
-
-                    # Get suggested photos to keep
-                    suggestions = service.suggest_duplicates_to_keep(group)
-
-                    for photo in group['photos']:
-                        keep_indicator = " (suggested to keep)" if photo['id'] == suggestions[0] else ""
-                        print(f"  Photo ID: {photo['id']}{keep_indicator}")
-                        print(f"    Path: {photo['file_path']}")
-                        print(f"    Size: {photo.get('file_size', 'unknown')} bytes")
-                        print(f"    Dimensions: {photo.get('width', '?')}x{photo.get('height', '?')}")
-                        print(f"    Date taken: {photo.get('date_taken', 'unknown')}")
-            else:
-                print(f"\nRun with --verbose to see detailed duplicate information.")
-
-            # Handle deletion if requested
-            if hasattr(args, 'auto_delete') and args.auto_delete:
-                deleted_count = 0
-                for group in duplicates:
-                    # Get suggestions of which photos to keep
-                    suggestions = service.suggest_duplicates_to_keep(group)
-                    keep_id = suggestions[0]
-
-                    # Delete all but the first suggested photo
-                    for photo in group['photos']:
-                        if photo['id'] != keep_id:
-                            permanent = hasattr(args, 'permanent') and args.permanent
-                            success = service.delete_duplicate(photo['id'], permanent=permanent)
-                            if success:
-                                deleted_count += 1
-
-                delete_type = "Permanently deleted" if (
-                            hasattr(args, 'permanent') and args.permanent) else "Moved to trash"
-                print(f"{delete_type} {deleted_count} duplicate photos.")
-
-            return 0
+            return _run_duplicates(args)
 
         else:
             print(f"Command '{args.command}' not implemented in process_cli_command")
@@ -179,13 +129,142 @@ def process_cli_command(args):
         return 1
 
 
+def _report_logger() -> logging.Logger:
+    """
+    Get the logger that writes command reports to stdout.
+
+    Records carry only the message and do not propagate to the root logger,
+    so reports look like plain output. The handler is rebuilt on each call to
+    follow the current sys.stdout.
+
+    Returns:
+        logging.Logger: The report logger
+    """
+    report_logger = logging.getLogger(__name__ + ".report")
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    report_logger.handlers = [handler]
+    report_logger.propagate = False
+    report_logger.setLevel(logging.INFO)
+    return report_logger
+
+
+class _DuplicateGroupReport:
+    """Verbose report for one duplicate group, formatted lazily by str()"""
+
+    __slots__ = ("number", "group", "keep_id")
+
+    def __init__(self, number: int, group: Dict[str, Any], keep_id: int):
+        self.number = number
+        self.group = group
+        self.keep_id = keep_id
+
+    def __str__(self) -> str:
+        lines = [f"\nDuplicate group {self.number} (hash: {self.group['file_hash']}):"]
+        for photo in self.group['photos']:
+            keep_indicator = " (suggested to keep)" if photo['id'] == self.keep_id else ""
+            lines.append(f"  Photo ID: {photo['id']}{keep_indicator}")
+            lines.append(f"    Path: {photo['file_path']}")
+            lines.append(f"    Size: {photo.get('file_size', 'unknown')} bytes")
+            lines.append(f"    Dimensions: {photo.get('width', '?')}x{photo.get('height', '?')}")
+            lines.append(f"    Date taken: {photo.get('date_taken', 'unknown')}")
+        return "\n".join(lines)
+
+
+def _run_duplicates(args, service=None) -> int:
+    """
+    Find duplicate photos and optionally report on and delete them.
+
+    Shared by the duplicates branch of process_cli_command and the
+    registered duplicates command.
+
+    Args:
+        args: Parsed arguments (folder_id, verbose, auto_delete, permanent, fast_hash)
+        service: DuplicateDetectionService to use (a new one if None)
+
+    Returns:
+        int: Exit code (0 for success)
+    """
+    fast_hash = getattr(args, 'fast_hash', False)
+    if service is None:
+        from src.core.duplicate_detection_service import DuplicateDetectionService
+        from src.core.hashing import FAST_HASH_ALGO, STORED_HASH_ALGO
+        # The on-disk check's hashes are never stored, so it can use the fastest algorithm
+        service = DuplicateDetectionService(hash_algo=FAST_HASH_ALGO if fast_hash else STORED_HASH_ALGO)
+
+    # Find duplicates
+    folder_id = getattr(args, 'folder_id', None)
+    if folder_id is not None:
+        print(f"Finding duplicates in folder {folder_id}...")
+    else:
+        print("Finding duplicates across the entire library...")
+    if fast_hash:
+        duplicates = service.find_content_duplicates(folder_id)
+    elif folder_id is not None:
+        duplicates = service.find_duplicates_in_folder(folder_id)
+    else:
+        duplicates = service.find_exact_duplicates()
+
+    if not duplicates:
+        print("No duplicate photos found.")
+        return 0
+
+    # Show statistics
+    stats = service.get_duplicate_statistics(duplicates)
+    print(f"Found {stats['total_groups']} groups of duplicate photos:")
+    print(f"  Total duplicates: {stats['total_duplicates']}")
+    print(f"  Wasted space: {stats['wasted_space_mb']:.2f} MB")
+    print(f"  Largest duplicate group: {stats['largest_group_size']} photos")
+
+    # Each group is scored once even when both verbose and auto-delete need it
+    suggestions_cache: Dict[str, List[int]] = {}
+
+    # Display duplicates
+    if getattr(args, 'verbose', False):
+        report_logger = _report_logger()
+        for i, group in enumerate(duplicates):
+            # Get suggested photos to keep
+            suggestions = suggestions_cache.get(group['file_hash'])
+            if suggestions is None:
+                suggestions = service.suggest_duplicates_to_keep(group)
+                suggestions_cache[group['file_hash']] = suggestions
+
+            # One record per group, formatted only if the report logger emits it
+            report_logger.info("%s", _DuplicateGroupReport(i + 1, group, suggestions[0]))
+    else:
+        print(f"\nRun with --verbose to see detailed duplicate information.")
+
+    # Handle deletion if requested
+    if getattr(args, 'auto_delete', False):
+        permanent = getattr(args, 'permanent', False)
+        to_delete = []
+        for group in duplicates:
+            # Get suggestions of which photos to keep
+            suggestions = suggestions_cache.get(group['file_hash'])
+            if suggestions is None:
+                suggestions = service.suggest_duplicates_to_keep(group)
+                suggestions_cache[group['file_hash']] = suggestions
+            keep_id = suggestions[0]
+
+            # Delete all but the first suggested photo
+            to_delete.extend(photo['id'] for photo in group['photos'] if photo['id'] != keep_id)
+
+        deleted_count = service.delete_duplicates_bulk(to_delete, permanent=permanent)
+
+        delete_type = "Permanently deleted" if permanent else "Moved to trash"
+        print(f"{delete_type} {deleted_count} duplicate photos.")
+
+    return 0
+
+
 class CliCommandRegistry:
     """Registry for CLI commands to allow extending the command set easily"""
 
     def __init__(self):
         self._commands = {}
 
-    def register_command(self, name: str, handler: Callable, parser_setup: Callable, help_text: str):
+    def register_command(self, name: str, handler: Callable, parser_setup: Callable, help_text: str,
+                         parents: Optional[List[argparse.ArgumentParser]] = None):
         """
         Register a new CLI command
         
@@ -194,19 +273,35 @@ class CliCommandRegistry:
             handler: Function that handles the command
             parser_setup: Function to set up command-specific arguments
             help_text: Brief help text for the command
+            parents: Parent parsers whose shared arguments the command inherits
         """
         self._commands[name] = {
             'handler': handler,
             'parser_setup': parser_setup,
-            'help': help_text
+            'help': help_text,
+            'parents': parents or []
         }
 
     def get_command(self, name: str) -> Dict[str, Any]:
-        """Get command details by name"""
-        return self._commands.get(name)
+        """Get command details by name, registering a built-in command on first use"""
+        cmd_info = self._commands.get(name)
+        if cmd_info is None and name in _BUILTIN_COMMANDS:
+            self.register_command(name=name, **_builtin_command(name))
+            cmd_info = self._commands.get(name)
+        return cmd_info
+
+    def get_command_help(self) -> Dict[str, str]:
+        """Get every command's help text without registering the built-in commands"""
+        help_texts = {name: cmd_info['help'] for name, cmd_info in self._commands.items()}
+        for name, (help_text, _, _) in _BUILTIN_COMMANDS.items():
+            help_texts.setdefault(name, help_text)
+        return help_texts
 
     def get_all_commands(self) -> Dict[str, Dict[str, Any]]:
-        """Get all registered commands"""
+        """Get all registered commands, including every built-in command"""
+        for name in _BUILTIN_COMMANDS:
+            if name not in self._commands:
+                self.register_command(name=name, **_builtin_command(name))
         return self._commands
 
 
@@ -214,23 +309,8 @@ class CliCommandRegistry:
 command_registry = CliCommandRegistry()
 
 
-def setup_parser() -> argparse.ArgumentParser:
-    """
-    Set up the command-line argument parser with all registered commands
-    
-    Returns:
-        argparse.ArgumentParser: Configured argument parser
-    """
-    parser = argparse.ArgumentParser(description="Pixels - Modern Photo Manager")
-    subparsers = parser.add_subparsers(dest="command", help="Commands")
-
-    # Add registered commands to parser
-    for cmd_name, cmd_info in command_registry.get_all_commands().items():
-        cmd_parser = subparsers.add_parser(cmd_name, help=cmd_info['help'])
-        cmd_info['parser_setup'](cmd_parser)
-
-    # Feature flag specific commands
-    feature_parser = subparsers.add_parser("feature", help="Manage feature flags")
+def _setup_feature_parser(feature_parser: argparse.ArgumentParser):
+    """Set up the feature flag subcommands"""
     feature_subparsers = feature_parser.add_subparsers(dest="feature_command", help="Feature flag commands")
 
     # List features command
@@ -244,8 +324,9 @@ def setup_parser() -> argparse.ArgumentParser:
     disable_parser = feature_subparsers.add_parser("disable", help="Disable a feature flag")
     disable_parser.add_argument("flag_name", help="Name of the flag to disable")
 
-    # Test command for quick tests
-    test_parser = subparsers.add_parser("test", help="Run tests on application components")
+
+def _setup_test_parser(test_parser: argparse.ArgumentParser):
+    """Set up the test subcommands"""
     test_subparsers = test_parser.add_subparsers(dest="test_command", help="Test commands")
 
     # Connection test
@@ -260,15 +341,77 @@ def setup_parser() -> argparse.ArgumentParser:
     thumb_test_parser.add_argument("path", help="Path to test thumbnail generation")
     thumb_test_parser.add_argument("--count", type=int, default=5, help="Number of images to process")
 
-    # Duplicates command for finding and managing duplicate photos
-    duplicates_parser = subparsers.add_parser("duplicates", help="Find and manage duplicate photos")
-    duplicates_parser.add_argument("--folder-id", type=int, help="Find duplicates only in a specific folder")
-    duplicates_parser.add_argument("--verbose", "-v", action="store_true",
-                                   help="Show detailed information about duplicates")
-    duplicates_parser.add_argument("--auto-delete", "-d", action="store_true",
-                                   help="Automatically delete duplicate photos (keeps the best quality one)")
-    duplicates_parser.add_argument("--permanent", "-p", action="store_true",
-                                   help="Permanently delete files instead of moving to trash")
+
+# Commands built into the parser itself: (name, help text, parser setup)
+_BUILTIN_PARSERS = [
+    ("feature", "Manage feature flags", _setup_feature_parser),
+    ("test", "Run tests on application components", _setup_test_parser),
+]
+
+
+def _sniff_subcommand(argv: List[str]) -> Optional[str]:
+    """
+    Find the requested subcommand without doing any argparse work.
+
+    The top-level parser has no options of its own besides -h, so the first
+    non-flag argument is the subcommand.
+
+    Args:
+        argv: Command line arguments, without the program name
+
+    Returns:
+        The subcommand name if it is a known command, otherwise None
+    """
+    for arg in argv:
+        if arg in ("-h", "--help"):
+            return None
+        if arg.startswith("-"):
+            continue
+        if arg in _SUBCOMMANDS or command_registry.get_command(arg):
+            return arg
+        return None
+    return None
+
+
+def setup_parser(target: Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    Set up the command-line argument parser
+
+    When a target command is given only its subparser is built. Each parser
+    setup function is a thunk that runs only when its command is the target,
+    so a single command does not pay for building every other command's
+    arguments.
+
+    Without a target (no arguments, -h or a typo) argparse never reaches a
+    subcommand's own arguments: it only prints the top-level help or an
+    invalid choice error. Every command is then listed by name and help
+    text alone, without running any setup thunk.
+
+    Args:
+        target: Command to build the parser for (see _sniff_subcommand)
+
+    Returns:
+        argparse.ArgumentParser: Configured argument parser
+    """
+    parser = argparse.ArgumentParser(description="Pixels - Modern Photo Manager")
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+
+    cmd_info = command_registry.get_command(target) if target else None
+    if cmd_info:
+        cmd_parser = subparsers.add_parser(target, help=cmd_info['help'], parents=cmd_info['parents'])
+        cmd_info['parser_setup'](cmd_parser)
+        return parser
+
+    for name, help_text, parser_setup in _BUILTIN_PARSERS:
+        if name == target:
+            parser_setup(subparsers.add_parser(name, help=help_text))
+            return parser
+
+    # Help-only listing
+    for name, help_text in command_registry.get_command_help().items():
+        subparsers.add_parser(name, help=help_text)
+    for name, help_text, _ in _BUILTIN_PARSERS:
+        subparsers.add_parser(name, help=help_text)
 
     return parser
 
@@ -283,7 +426,10 @@ def execute_cli(args: Optional[List[str]] = None) -> int:
     Returns:
         int: Exit code (0 for success, non-zero for errors)
     """
-    parser = setup_parser()
+    if args is None:
+        args = sys.argv[1:]
+
+    parser = setup_parser(_sniff_subcommand(args))
     parsed_args = parser.parse_args(args)
 
     if not parsed_args.command:
@@ -313,6 +459,7 @@ def execute_cli(args: Optional[List[str]] = None) -> int:
 
 def handle_feature_commands(args):
     """Handle feature flag related commands"""
+    from src.core.feature_flags import get_feature_flags
     feature_flags = get_feature_flags()
 
     if args.feature_command == "list":
@@ -325,6 +472,7 @@ def handle_feature_commands(args):
     elif args.feature_command == "enable":
         try:
             feature_flags.enable(args.flag_name)
+            feature_flags.flush()
             print(f"Feature '{args.flag_name}' enabled")
             return 0
         except Exception as e:
@@ -334,6 +482,7 @@ def handle_feature_commands(args):
     elif args.feature_command == "disable":
         try:
             feature_flags.disable(args.flag_name)
+            feature_flags.flush()
             print(f"Feature '{args.flag_name}' disabled")
             return 0
         except Exception as e:
@@ -367,11 +516,11 @@ def test_database_connection():
     try:
         from src.core.database import Database
         print("Testing database connection...")
-        start_time = time.time()
+        start_time = time.perf_counter()
         db = Database()
         connection = db.get_connection()
         if connection:
-            print(f"Database connection successful ({time.time() - start_time:.2f}s)")
+            print(f"Database connection successful ({time.perf_counter() - start_time:.2f}s)")
             return 0
         else:
             print("Database connection failed")
@@ -389,10 +538,10 @@ def test_scanner_functionality(path):
     try:
         from src.core.scanner import FileSystemScanner, get_scan_summary
         print(f"Testing scanner on path: {path}")
-        start_time = time.time()
+        start_time = time.perf_counter()
         scanner = FileSystemScanner()
         result = scanner.scan_directory(path, recursive=True)
-        elapsed = time.time() - start_time
+        elapsed = time.perf_counter() - start_time
 
         summary = get_scan_summary(result)
         print(f"Scan completed in {elapsed:.2f}s")
@@ -403,26 +552,31 @@ def test_scanner_functionality(path):
         return 1
 
 
+def _walk_images(root: str):
+    """
+    Yield image file paths under a directory tree, lazily.
+
+    Args:
+        root: Directory to walk
+
+    Yields:
+        Path of each file with an image extension
+    """
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.lower().endswith(_IMAGE_EXTENSIONS):
+                yield os.path.join(dirpath, filename)
+
+
 def test_thumbnail_generation(path, count):
     """Test thumbnail generation"""
     try:
-        import os
-        from src.core.scanner import FileSystemScanner
         from src.core.thumbnail_service import ThumbnailService
 
         print(f"Testing thumbnail generation on up to {count} images in {path}")
 
-        # First scan to find images
-        scanner = FileSystemScanner()
-        result = scanner.scan_directory(path, recursive=True)
-
-        # Filter image files
-        image_files = []
-        for file_info in result.get('files', []):
-            if file_info.get('is_image', False):
-                image_files.append(file_info['path'])
-                if len(image_files) >= count:
-                    break
+        # Stop walking as soon as enough images have been found
+        image_files = list(itertools.islice(_walk_images(path), count))
 
         if not image_files:
             print("No image files found in the specified path")
@@ -430,17 +584,21 @@ def test_thumbnail_generation(path, count):
 
         # Generate thumbnails
         thumb_service = ThumbnailService()
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        for idx, image_path in enumerate(image_files, 1):
+        # Decoding and resizing release the GIL, so thumbnails are generated
+        # on a thread pool and reported in order once they are all done
+        with ThreadPoolExecutor(max_workers=min(THUMBNAIL_TEST_WORKERS, os.cpu_count() or 4)) as executor:
+            thumb_paths = list(executor.map(thumb_service.generate_thumbnail, image_files))
+
+        for idx, (image_path, thumb_path) in enumerate(zip(image_files, thumb_paths), 1):
             print(f"Generating thumbnail {idx}/{len(image_files)}: {os.path.basename(image_path)}")
-            thumb_path = thumb_service.generate_thumbnail(image_path)
             if thumb_path:
                 print(f"  ✓ Thumbnail saved to: {thumb_path}")
             else:
                 print(f"  ✗ Failed to generate thumbnail")
 
-        elapsed = time.time() - start_time
+        elapsed = time.perf_counter() - start_time
         print(f"Generated {len(image_files)} thumbnails in {elapsed:.2f}s")
         return 0
     except Exception as e:
@@ -448,188 +606,110 @@ def test_thumbnail_generation(path, count):
         return 1
 
 
-def register_scan_command():
-    """Register the scan command"""
-
-    def setup_parser(parser):
-        parser.add_argument("path", help="Directory path to scan")
-        parser.add_argument("--recursive", "-r", action="store_true", help="Scan subdirectories recursively")
-
-    def handler(args):
-        from src.core.scanner import FileSystemScanner, get_scan_summary
-        scanner = FileSystemScanner()
-        result = scanner.scan_directory(args.path, args.recursive)
-        print(get_scan_summary(result))
-        return 0
-
-    command_registry.register_command(
-        name="scan",
-        handler=handler,
-        parser_setup=setup_parser,
-        help_text="Scan a directory for images"
-    )
-
-
-def register_index_command():
-    """Register the index command"""
-
-    def setup_parser(parser):
-        parser.add_argument("path", help="Directory path to index")
-        parser.add_argument("--recursive", "-r", action="store_true", help="Index subdirectories recursively")
-        parser.add_argument("--monitor", "-m", action="store_true", help="Monitor directory for changes")
-        parser.add_argument("--db", help="Path to database file")
-
-    def handler(args):
-        from src.core.library_indexer import LibraryIndexer
-        indexer = LibraryIndexer(args.db)
-        folders, photos, elapsed = indexer.index_folder(args.path, args.recursive, args.monitor)
-        print(f"Indexed {photos} photos in {folders} folders in {elapsed:.2f} seconds")
-        return 0
-
-    command_registry.register_command(
-        name="index",
-        handler=handler,
-        parser_setup=setup_parser,
-        help_text="Index a directory into the library"
-    )
+def _scan_handler(args):
+    """Handle the scan command"""
+    from src.core.scanner import FileSystemScanner, get_scan_summary
+    scanner = FileSystemScanner()
+    result = scanner.scan_directory(args.path, args.recursive)
+    print(get_scan_summary(result))
+    return 0
 
 
-def register_extract_command():
-    """Register the extract command"""
+def _index_handler(args):
+    """Handle the index command"""
+    from src.core.library_indexer import LibraryIndexer
+    indexer = LibraryIndexer(args.db)
+    folders, photos, elapsed = indexer.index_folder(args.path, args.recursive, args.monitor)
+    print(f"Indexed {photos} photos in {folders} folders in {elapsed:.2f} seconds")
+    return 0
 
-    def setup_parser(parser):
-        parser.add_argument("path", help="Path to the image file")
-        parser.add_argument("--json", "-j", action="store_true", help="Output in JSON format")
 
-    def handler(args):
-        import json
-        from src.core.metadata_extractor import MetadataExtractor
-        extractor = MetadataExtractor()
-        metadata = extractor.extract_metadata(args.path)
+def _extract_handler(args):
+    """Handle the extract command"""
+    from src.core.metadata_extractor import MetadataExtractor
+    extractor = MetadataExtractor()
+    metadata = extractor.extract_metadata(args.path)
 
-        if args.json:
-            print(json.dumps(metadata, indent=2))
-        else:
-            print("Metadata:")
-            for key, value in metadata.items():
-                print(f"  {key}: {value}")
-        return 0
-
-    command_registry.register_command(
-        name="extract",
-        handler=handler,
-        parser_setup=setup_parser,
-        help_text="Extract metadata from an image"
-    )
-
-
-def register_refresh_command():
-    """Register the refresh command"""
-
-    def setup_parser(parser):
-        parser.add_argument("--db", help="Path to database file")
-
-    def handler(args):
-        from src.core.library_indexer import LibraryIndexer
-        indexer = LibraryIndexer(args.db)
-        folders, photos, elapsed = indexer.refresh_index()
-        print(f"Updated {folders} folders and added {photos} new photos in {elapsed:.2f} seconds")
-        return 0
-
-    command_registry.register_command(
-        name="refresh",
-        handler=handler,
-        parser_setup=setup_parser,
-        help_text="Refresh the library index"
-    )
-
-
-def register_duplicates_command():
-    """Register the duplicates command"""
-
-    def setup_parser(parser):
-        parser.add_argument("--folder-id", type=int, help="Find duplicates only in a specific folder")
-        parser.add_argument("--verbose", "-v", action="store_true", help="Show detailed information about duplicates")
-        parser.add_argument("--auto-delete", "-d", action="store_true",
-                            help="Automatically delete duplicate photos (keeps the best quality one)")
-        parser.add_argument("--permanent", "-p", action="store_true",
-                            help="Permanently delete files instead of moving to trash")
-
-    def handler(args):
-        from src.core.duplicate_detection_service import DuplicateDetectionService
-
-        # Initialize the duplicate detection service
-        service = DuplicateDetectionService()
-
-        # Find duplicates
-        if hasattr(args, 'folder_id') and args.folder_id is not None:
-            print(f"Finding duplicates in folder {args.folder_id}...")
-            duplicates = service.find_duplicates_in_folder(args.folder_id)
-        else:
-            print("Finding duplicates across the entire library...")
-            duplicates = service.find_exact_duplicates()
-
-        if not duplicates:
-            print("No duplicate photos found.")
-            return 0
-
-        # Show statistics
-        stats = service.get_duplicate_statistics()
-        print(f"Found {stats['total_groups']} groups of duplicate photos:")
-        print(f"  Total duplicates: {stats['total_duplicates']}")
-        print(f"  Wasted space: {stats['wasted_space_mb']:.2f} MB")
-        print(f"  Largest duplicate group: {stats['largest_group_size']} photos")
-
-        # Display duplicates
-        if hasattr(args, 'verbose') and args.verbose:
-            for i, group in enumerate(duplicates):
-                print(f"\nDuplicate group {i + 1} (hash: {group['file_hash']}):")
-
-                # Get suggested photos to keep
-                suggestions = service.suggest_duplicates_to_keep(group)
-
-                for photo in group['photos']:
-                    keep_indicator = " (suggested to keep)" if photo['id'] == suggestions[0] else ""
-                    print(f"  Photo ID: {photo['id']}{keep_indicator}")
-                    print(f"    Path: {photo['file_path']}")
-                    print(f"    Size: {photo.get('file_size', 'unknown')} bytes")
-                    print(f"    Dimensions: {photo.get('width', '?')}x{photo.get('height', '?')}")
-                    print(f"    Date taken: {photo.get('date_taken', 'unknown')}")
-        else:
-            print(f"\nRun with --verbose to see detailed duplicate information.")
-
-        # Handle deletion if requested
-        if hasattr(args, 'auto_delete') and args.auto_delete:
-            deleted_count = 0
-            for group in duplicates:
-                # Get suggestions of which photos to keep
-                suggestions = service.suggest_duplicates_to_keep(group)
-                keep_id = suggestions[0]
-
-                # Delete all but the first suggested photo
-                for photo in group['photos']:
-                    if photo['id'] != keep_id:
-                        permanent = hasattr(args, 'permanent') and args.permanent
-                        success = service.delete_duplicate(photo['id'], permanent=permanent)
-                        if success:
-                            deleted_count += 1
-
-            delete_type = "Permanently deleted" if (hasattr(args, 'permanent') and args.permanent) else "Moved to trash"
-            print(f"{delete_type} {deleted_count} duplicate photos.")
-
-        return 0
-
-    command_registry.register_command(
-        name="duplicates",
-        handler=handler,
-        parser_setup=setup_parser,
-        help_text="Find and manage duplicate photos"
-    )
-
-
-# Register built-in commands
-register_scan_command()
-register_index_command()
-register_extract_command()
-register_refresh_command()
-register_duplicates_command()
+    if args.json:
+        print(json.dumps(metadata, indent=2))
+    else:
+        print("Metadata:")
+        for key, value in metadata.items():
+            print(f"  {key}: {value}")
+    return 0
+
+
+def _refresh_handler(args):
+    """Handle the refresh command"""
+    from src.core.library_indexer import LibraryIndexer
+    indexer = LibraryIndexer(args.db)
+    folders, photos, elapsed = indexer.refresh_index()
+    print(f"Updated {folders} folders and added {photos} new photos in {elapsed:.2f} seconds")
+    return 0
+
+
+def _duplicates_handler(args):
+    """Handle the duplicates command"""
+    return _run_duplicates(args)
+
+
+# (flags, add_argument keyword arguments) pairs describing a command's arguments
+_Arguments = Tuple[Tuple[Tuple[str, ...], Dict[str, Any]], ...]
+
+
+def _add_arguments(parser: argparse.ArgumentParser, arguments: _Arguments):
+    """Add (flags, add_argument keyword arguments) pairs to a parser"""
+    for flags, kwargs in arguments:
+        parser.add_argument(*flags, **kwargs)
+
+
+# Shared by the commands that open the library
+_DB_ARGUMENT = (("--db",), {"help": "Path to database file"})
+
+# Built-in commands: name -> (help text, handler, arguments). Arguments are
+# added only when the command is the one being run; handlers import their
+# dependencies when called.
+_BUILTIN_COMMANDS: Dict[str, Tuple[str, Callable, _Arguments]] = {
+    "scan": ("Scan a directory for images", _scan_handler, (
+        (("path",), {"help": "Directory path to scan"}),
+        (("--recursive", "-r"), {"action": "store_true", "help": "Scan subdirectories recursively"}),
+    )),
+    "index": ("Index a directory into the library", _index_handler, (
+        _DB_ARGUMENT,
+        (("path",), {"help": "Directory path to index"}),
+        (("--recursive", "-r"), {"action": "store_true", "help": "Index subdirectories recursively"}),
+        (("--monitor", "-m"), {"action": "store_true", "help": "Monitor directory for changes"}),
+    )),
+    "extract": ("Extract metadata from an image", _extract_handler, (
+        (("path",), {"help": "Path to the image file"}),
+        (("--json", "-j"), {"action": "store_true", "help": "Output in JSON format"}),
+    )),
+    "refresh": ("Refresh the library index", _refresh_handler, (
+        _DB_ARGUMENT,
+    )),
+    "duplicates": ("Find and manage duplicate photos", _duplicates_handler, (
+        (("--folder-id",), {"type": int, "help": "Find duplicates only in a specific folder"}),
+        (("--verbose", "-v"), {"action": "store_true", "help": "Show detailed information about duplicates"}),
+        (("--auto-delete", "-d"), {"action": "store_true",
+                                   "help": "Automatically delete duplicate photos (keeps the best quality one)"}),
+        (("--permanent", "-p"), {"action": "store_true",
+                                 "help": "Permanently delete files instead of moving to trash"}),
+        (("--fast-hash",), {"action": "store_true",
+                            "help": "Check same-size files on disk with the fastest available hash "
+                                    "instead of trusting the stored hashes"}),
+    )),
+}
+
+
+def _builtin_command(name: str) -> Dict[str, Any]:
+    """Build a built-in command's register_command arguments from its table entry"""
+    help_text, handler, arguments = _BUILTIN_COMMANDS[name]
+    return {
+        "handler": handler,
+        "parser_setup": partial(_add_arguments, arguments=arguments),
+        "help_text": help_text,
+    }
+
+
+# Every built-in command name, so sniffing the target is a set lookup
+_SUBCOMMANDS = frozenset(_BUILTIN_COMMANDS) | frozenset(name for name, _, _ in _BUILTIN_PARSERS)
@@ -6,10 +6,16 @@ This module defines the SQLite schema and provides a Data Access Layer (DAL)
 for performing CRUD operations on the photo library database.
 """
 
+import logging
 import os
+import queue
 import sqlite3
+import tempfile
 import threading
-from typing import Dict, List
+from contextlib import contextmanager
+from typing import Dict, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
 
 
 class PhotoDatabase:
@@ -18,6 +24,16 @@ class PhotoDatabase:
     _instance = None
     _lock = threading.Lock()
 
+    # Number of pooled read-only connections. Writes go through self.conn.
+    READ_POOL_SIZE = 8
+
+    # Most ids bound into one "IN (...)" query; SQLite's historical variable limit
+    MAX_QUERY_VARIABLES = 999
+
+    # Columns added to the photos table since it was first created, with their types
+    ADDED_PHOTO_COLUMNS = {'file_mtime_ns': 'INTEGER', 'file_inode': 'INTEGER', 'hash_algo': 'TEXT',
+                           'perceptual_hash': 'BLOB', 'is_trashed': 'INTEGER DEFAULT 0'}
+
     # Singleton pattern to ensure only one database connection
     def __new__(cls, db_path: str = None):
         with cls._lock:
@@ -45,6 +61,9 @@ class PhotoDatabase:
             db_dir = os.path.dirname(self.db_path)
             if db_dir and not os.path.exists(db_dir):
                 os.makedirs(db_dir, exist_ok=True)
+            self.app_trash_path = os.path.join(os.path.dirname(os.path.abspath(self.db_path)), "app_trash")
+        else:
+            self.app_trash_path = os.path.join(tempfile.gettempdir(), "pixels_app_trash")
 
         # Check if database file exists before connecting
         db_exists = os.path.exists(self.db_path) if self.db_path != ':memory:' else False
@@ -57,14 +76,17 @@ class PhotoDatabase:
             # Only create tables if the database is new
             if not db_exists or self.db_path == ':memory:':
                 self._create_tables()
+            else:
+                self._add_missing_columns()
 
+            self._read_pool = self._create_read_pool()
             self._initialized = True
         except sqlite3.Error as e:
             # Log error but don't fail catastrophically if database exists
-            import logging
-            logging.warning(f"Database initialization warning: {e}. Continuing...")
+            logger.warning("Database initialization warning: %s. Continuing...", e)
             # If connection was established but tables creation failed, we can still use the DB
             if hasattr(self, 'conn') and self.conn:
+                self._read_pool = None
                 self._initialized = True
             else:
                 # Only re-raise if we couldn't connect at all
@@ -97,6 +119,14 @@ class PhotoDatabase:
                            INTEGER,
                            file_hash
                            TEXT,
+                           hash_algo
+                           TEXT,
+                           file_mtime_ns
+                           INTEGER,
+                           file_inode
+                           INTEGER,
+                           perceptual_hash
+                           BLOB,
                            width
                            INTEGER,
                            height
@@ -127,6 +157,10 @@ class PhotoDatabase:
                            INTEGER
                            DEFAULT
                            0,
+                           is_trashed
+                           INTEGER
+                           DEFAULT
+                           0,
                            FOREIGN
                            KEY
                        (
@@ -408,8 +442,86 @@ class PhotoDatabase:
 
         self.conn.commit()
 
+    def _add_missing_columns(self):
+        """Add columns introduced since an existing database was created."""
+        cursor = self.conn.cursor()
+        cursor.execute('PRAGMA table_info(photos)')
+        existing = {row['name'] for row in cursor.fetchall()}
+        if not existing:
+            return
+
+        for name, column_type in self.ADDED_PHOTO_COLUMNS.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE photos ADD COLUMN {name} {column_type}')
+        self.conn.commit()
+
+    def _create_read_pool(self):
+        """
+        Open the pool of read-only connections.
+
+        An in-memory database is private to its connection, so no pool is
+        created for it and reads fall back to the main connection.
+
+        Returns:
+            Queue of connections, or None if pooling is not possible
+        """
+        if self.db_path == ':memory:':
+            return None
+
+        # WAL lets readers run alongside the writer instead of blocking on it.
+        # In WAL mode, synchronous=NORMAL only syncs at checkpoints and stays
+        # safe against corruption; a power loss can only drop the last commits.
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+
+        pool = queue.Queue()
+        for _ in range(self.READ_POOL_SIZE):
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            # Keep the temporary b-trees of GROUP BY and ORDER BY queries off disk
+            conn.execute('PRAGMA temp_store=MEMORY')
+            pool.put(conn)
+        return pool
+
+    @contextmanager
+    def _read_connection(self):
+        """
+        Borrow a connection from the read pool for the duration of a query.
+
+        Yields:
+            A sqlite3 connection
+        """
+        pool = getattr(self, '_read_pool', None)
+        if pool is None:
+            yield self.conn
+            return
+
+        conn = pool.get()
+        try:
+            yield conn
+        finally:
+            pool.put(conn)
+
+    def get_revision(self) -> Tuple[int, int]:
+        """
+        Get a marker that changes whenever the database contents change.
+
+        Combines the rows changed through this connection with SQLite's
+        data_version, which moves when another connection commits.
+
+        Returns:
+            Tuple that compares equal only while nothing has been written
+        """
+        data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        return self.conn.total_changes, data_version
+
     def close(self):
         """Close the database connection."""
+        pool = getattr(self, '_read_pool', None)
+        if pool is not None:
+            while not pool.empty():
+                pool.get_nowait().close()
+            self._read_pool = None
         if hasattr(self, 'conn') and self.conn:
             self.conn.close()
 
@@ -437,17 +549,19 @@ class PhotoDatabase:
 
     def get_folder(self, folder_id: int) -> Dict:
         """Get folder details by ID."""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM folders WHERE id = ?', (folder_id,))
-        result = cursor.fetchone()
-        return dict(result) if result else None
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM folders WHERE id = ?', (folder_id,))
+            result = cursor.fetchone()
+            return dict(result) if result else None
 
     def get_folder_by_path(self, path: str) -> Dict:
         """Get folder details by path."""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM folders WHERE path = ?', (path,))
-        result = cursor.fetchone()
-        return dict(result) if result else None
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM folders WHERE path = ?', (path,))
+            result = cursor.fetchone()
+            return dict(result) if result else None
 
     def update_folder(self, folder_id: int, **kwargs) -> bool:
         """Update folder properties."""
@@ -480,9 +594,10 @@ class PhotoDatabase:
 
     def get_all_folders(self) -> List[Dict]:
         """Get all folders."""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM folders')
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM folders')
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_child_folders(self, parent_id: int = None) -> List[Dict]:
         """
@@ -494,14 +609,15 @@ class PhotoDatabase:
         Returns:
             List of folder dictionaries
         """
-        cursor = self.conn.cursor()
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
 
-        if parent_id is None:
-            cursor.execute('SELECT * FROM folders WHERE parent_id IS NULL')
-        else:
-            cursor.execute('SELECT * FROM folders WHERE parent_id = ?', (parent_id,))
+            if parent_id is None:
+                cursor.execute('SELECT * FROM folders WHERE parent_id IS NULL')
+            else:
+                cursor.execute('SELECT * FROM folders WHERE parent_id = ?', (parent_id,))
 
-        return [dict(row) for row in cursor.fetchall()]
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_folder_hierarchy(self) -> List[Dict]:
         """
@@ -538,20 +654,7 @@ class PhotoDatabase:
         cursor = self.conn.cursor()
 
         # Build the query dynamically based on provided fields
-        fields = ['file_path', 'file_name', 'folder_id', 'date_added']
-        values = [file_path, file_name, folder_id, 'datetime("now")']
-
-        for key, value in kwargs.items():
-            fields.append(key)
-            values.append(value)
-
-        placeholders = ', '.join(['?'] * len(values))
-        field_names = ', '.join(fields)
-
-        cursor.execute(
-            f"INSERT OR IGNORE INTO photos ({field_names}) VALUES ({placeholders})",
-            values
-        )
+        cursor.execute(self._insert_photo_sql(tuple(kwargs)), (file_path, file_name, folder_id, *kwargs.values()))
         self.conn.commit()
 
         # Get the ID of the inserted photo
@@ -559,19 +662,133 @@ class PhotoDatabase:
         result = cursor.fetchone()
         return result[0] if result else None
 
+    def get_photo_columns(self) -> Set[str]:
+        """
+        Get the names of the columns of the photos table.
+
+        Returns:
+            Set of column names.
+        """
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('PRAGMA table_info(photos)')
+            return {row['name'] for row in cursor.fetchall()}
+
+    def add_photos(self, photos: List[Tuple[str, int, Dict]]) -> int:
+        """
+        Add several photos to the database in one transaction.
+
+        Photos with the same set of fields are inserted with a single
+        executemany() call. If the transaction fails it is rolled back and
+        the photos are inserted one at a time instead, so only the photos
+        that cannot be stored are lost.
+
+        Args:
+            photos: (file_path, folder_id, fields) for each photo, where fields
+                holds the other column values as for add_photo.
+
+        Returns:
+            Number of photos added; paths already in the database are ignored.
+        """
+        rows_by_fields = {}
+        for file_path, folder_id, fields in photos:
+            rows_by_fields.setdefault(tuple(fields), []).append(
+                (file_path, os.path.basename(file_path), folder_id, *fields.values()))
+
+        try:
+            added = 0
+            with self.conn:
+                cursor = self.conn.cursor()
+                for fields, rows in rows_by_fields.items():
+                    cursor.executemany(self._insert_photo_sql(fields), rows)
+                    added += cursor.rowcount
+            return added
+        except sqlite3.Error as e:
+            logger.warning("Batch insert of %s photos failed (%s); inserting one at a time", len(photos), e)
+
+        added = 0
+        for fields, rows in rows_by_fields.items():
+            sql = self._insert_photo_sql(fields)
+            for row in rows:
+                try:
+                    with self.conn:
+                        added += self.conn.execute(sql, row).rowcount
+                except sqlite3.Error as e:
+                    logger.error("Failed to add photo %s: %s", row[0], e)
+        return added
+
+    @staticmethod
+    def _insert_photo_sql(fields: Tuple[str, ...]) -> str:
+        """
+        Build the INSERT statement used by add_photo and add_photos for one set of fields.
+
+        Args:
+            fields: Names of the columns given besides file_path, file_name
+                and folder_id.
+
+        Returns:
+            SQL statement with one placeholder per given column; date_added
+            is set to the current time by SQLite.
+        """
+        field_names = ', '.join(('file_path', 'file_name', 'folder_id', 'date_added') + fields)
+        placeholders = ', '.join(['?', '?', '?', "datetime('now')"] + ['?'] * len(fields))
+        return f"INSERT OR IGNORE INTO photos ({field_names}) VALUES ({placeholders})"
+
     def get_photo(self, photo_id: int) -> Dict:
         """Get photo details by ID."""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM photos WHERE id = ?', (photo_id,))
-        result = cursor.fetchone()
-        return dict(result) if result else None
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM photos WHERE id = ?', (photo_id,))
+            result = cursor.fetchone()
+            return dict(result) if result else None
+
+    def get_photos(self, photo_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Get the details of several photos.
+
+        Args:
+            photo_ids: IDs of the photos to look up.
+
+        Returns:
+            Mapping of photo ID to photo details for the photos that exist.
+        """
+        photos = {}
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(photo_ids), self.MAX_QUERY_VARIABLES):
+                chunk = photo_ids[start:start + self.MAX_QUERY_VARIABLES]
+                placeholders = ', '.join(['?'] * len(chunk))
+                cursor.execute(f'SELECT * FROM photos WHERE id IN ({placeholders})', chunk)
+                photos.update((row['id'], dict(row)) for row in cursor.fetchall())
+        return photos
+
+    def get_photos_by_paths(self, file_paths: List[str]) -> Dict[str, Dict]:
+        """
+        Get the details of several photos by file path.
+
+        Args:
+            file_paths: File paths of the photos to look up.
+
+        Returns:
+            Mapping of file path to photo details for the photos that exist.
+        """
+        photos = {}
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(file_paths), self.MAX_QUERY_VARIABLES):
+                chunk = file_paths[start:start + self.MAX_QUERY_VARIABLES]
+                placeholders = ', '.join(['?'] * len(chunk))
+                cursor.execute(f'SELECT * FROM photos WHERE file_path IN ({placeholders})', chunk)
+                photos.update((row['file_path'], dict(row)) for row in cursor.fetchall())
+        return photos
 
     def get_photo_by_path(self, file_path: str) -> Dict:
         """Get photo details by file path."""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM photos WHERE file_path = ?', (file_path,))
-        result = cursor.fetchone()
-        return dict(result) if result else None
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM photos WHERE file_path = ?', (file_path,))
+            result = cursor.fetchone()
+            return dict(result) if result else None
 
     def update_photo(self, photo_id: int, **kwargs) -> bool:
         """Update photo properties."""
@@ -604,9 +821,10 @@ class PhotoDatabase:
 
     def get_photos_by_folder(self, folder_id: int) -> List[Dict]:
         """Get all photos in a specified folder."""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM photos WHERE folder_id = ?', (folder_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM photos WHERE folder_id = ?', (folder_id,))
+            return [dict(row) for row in cursor.fetchall()]
 
     # Enhanced query methods
     def search_photos(self,
@@ -668,11 +886,11 @@ class PhotoDatabase:
                 all_folder_ids = set(folder_ids)
                 for folder_id in folder_ids:
                     # Recursively add all subfolders
-                    queue = [folder_id]
-                    while queue:
-                        current_id = queue.pop(0)
+                    pending = [folder_id]
+                    while pending:
+                        current_id = pending.pop(0)
                         subfolders = [f['id'] for f in self.get_child_folders(current_id)]
-                        queue.extend(subfolders)
+                        pending.extend(subfolders)
                         all_folder_ids.update(subfolders)
 
                 # Use the expanded set of folder IDs
@@ -727,16 +945,18 @@ class PhotoDatabase:
         params.extend([limit, offset])
 
         # Execute query
-        cursor = self.conn.cursor()
-        cursor.execute(' '.join(query_parts), params)
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(' '.join(query_parts), params)
 
-        return [dict(row) for row in cursor.fetchall()]
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_photo_count(self) -> int:
         """Get the total number of photos in the database."""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM photos')
-        return cursor.fetchone()[0]
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM photos')
+            return cursor.fetchone()[0]
 
     def get_photos_by_date_range(self, start_date: str, end_date: str) -> List[Dict]:
         """
@@ -749,12 +969,13 @@ class PhotoDatabase:
         Returns:
             List of photo dictionaries
         """
-        cursor = self.conn.cursor()
-        cursor.execute(
-            'SELECT * FROM photos WHERE date_taken >= ? AND date_taken <= ? ORDER BY date_taken',
-            (start_date, end_date)
-        )
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT * FROM photos WHERE date_taken >= ? AND date_taken <= ? ORDER BY date_taken',
+                (start_date, end_date)
+            )
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_favorite_photos(self, limit: int = 100, offset: int = 0) -> List[Dict]:
         """
@@ -767,12 +988,13 @@ class PhotoDatabase:
         Returns:
             List of photo dictionaries
         """
-        cursor = self.conn.cursor()
-        cursor.execute(
-            'SELECT * FROM photos WHERE is_favorite = 1 ORDER BY date_taken DESC LIMIT ? OFFSET ?',
-            (limit, offset)
-        )
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT * FROM photos WHERE is_favorite = 1 ORDER BY date_taken DESC LIMIT ? OFFSET ?',
+                (limit, offset)
+            )
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_photos_by_rating(self, min_rating: int, limit: int = 100, offset: int = 0) -> List[Dict]:
         """
@@ -786,12 +1008,13 @@ class PhotoDatabase:
         Returns:
             List of photo dictionaries
         """
-        cursor = self.conn.cursor()
-        cursor.execute(
-            'SELECT * FROM photos WHERE rating >= ? ORDER BY rating DESC, date_taken DESC LIMIT ? OFFSET ?',
-            (min_rating, limit, offset)
-        )
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT * FROM photos WHERE rating >= ? ORDER BY rating DESC, date_taken DESC LIMIT ? OFFSET ?',
+                (min_rating, limit, offset)
+            )
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_recent_photos(self, limit: int = 100) -> List[Dict]:
         """
@@ -803,12 +1026,13 @@ class PhotoDatabase:
         Returns:
             List of photo dictionaries
         """
-        cursor = self.conn.cursor()
-        cursor.execute(
-            'SELECT * FROM photos ORDER BY date_added DESC LIMIT ?',
-            (limit,)
-        )
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT * FROM photos ORDER BY date_added DESC LIMIT ?',
+                (limit,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
 
     # CRUD operations for tags
     def add_tag(self, name: str, parent_id: int = None) -> int:
@@ -846,10 +1070,11 @@ class PhotoDatabase:
         Returns:
             Dictionary with tag information
         """
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM tags WHERE id = ?', (tag_id,))
-        result = cursor.fetchone()
-        return dict(result) if result else None
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM tags WHERE id = ?', (tag_id,))
+            result = cursor.fetchone()
+            return dict(result) if result else None
 
     def get_tag_by_name(self, name: str) -> Dict:
         """
@@ -861,10 +1086,11 @@ class PhotoDatabase:
         Returns:
             Dictionary with tag information
         """
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM tags WHERE name = ?', (name,))
-        result = cursor.fetchone()
-        return dict(result) if result else None
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM tags WHERE name = ?', (name,))
+            result = cursor.fetchone()
+            return dict(result) if result else None
 
     def update_tag(self, tag_id: int, name: str = None, parent_id: int = None) -> bool:
         """
@@ -936,9 +1162,22 @@ class PhotoDatabase:
         Returns:
             List of tag dictionaries
         """
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM tags ORDER BY name')
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM tags ORDER BY name')
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_tag_photo_counts(self) -> Dict[int, int]:
+        """
+        Get the number of photos carrying every tag with a single query.
+
+        Returns:
+            Dictionary mapping tag IDs to photo counts
+        """
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT tag_id, COUNT(*) FROM photo_tags GROUP BY tag_id')
+            return dict(cursor.fetchall())
 
     def get_tag_hierarchy(self) -> List[Dict]:
         """
@@ -1017,18 +1256,19 @@ class PhotoDatabase:
         Returns:
             List of tag dictionaries
         """
-        cursor = self.conn.cursor()
-        cursor.execute(
-            '''
-            SELECT t.*
-            FROM tags t
-                     JOIN photo_tags pt ON t.id = pt.tag_id
-            WHERE pt.photo_id = ?
-            ORDER BY t.name
-            ''',
-            (photo_id,)
-        )
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''
+                SELECT t.*
+                FROM tags t
+                         JOIN photo_tags pt ON t.id = pt.tag_id
+                WHERE pt.photo_id = ?
+                ORDER BY t.name
+                ''',
+                (photo_id,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_photos_by_tag(self, tag_id: int, limit: int = 100, offset: int = 0) -> List[Dict]:
         """
@@ -1042,19 +1282,20 @@ class PhotoDatabase:
         Returns:
             List of photo dictionaries
         """
-        cursor = self.conn.cursor()
-        cursor.execute(
-            '''
-            SELECT p.*
-            FROM photos p
-                     JOIN photo_tags pt ON p.id = pt.photo_id
-            WHERE pt.tag_id = ?
-            ORDER BY p.date_taken DESC LIMIT ?
-            OFFSET ?
-            ''',
-            (tag_id, limit, offset)
-        )
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''
+                SELECT p.*
+                FROM photos p
+                         JOIN photo_tags pt ON p.id = pt.photo_id
+                WHERE pt.tag_id = ?
+                ORDER BY p.date_taken DESC LIMIT ?
+                OFFSET ?
+                ''',
+                (tag_id, limit, offset)
+            )
+            return [dict(row) for row in cursor.fetchall()]
 
     # CRUD operations for albums
     def create_album(self, name: str, description: str = "") -> int:
@@ -1089,10 +1330,11 @@ class PhotoDatabase:
         Returns:
             Dictionary with album information
         """
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM albums WHERE id = ?', (album_id,))
-        result = cursor.fetchone()
-        return dict(result) if result else None
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM albums WHERE id = ?', (album_id,))
+            result = cursor.fetchone()
+            return dict(result) if result else None
 
     def update_album(self, album_id: int, name: str = None, description: str = None) -> bool:
         """
@@ -1159,9 +1401,22 @@ class PhotoDatabase:
         Returns:
             List of album dictionaries
         """
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM albums ORDER BY name')
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM albums ORDER BY name')
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_album_photo_counts(self) -> Dict[int, int]:
+        """
+        Get the number of photos in every album with a single query.
+
+        Returns:
+            Dictionary mapping album IDs to photo counts
+        """
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT album_id, COUNT(*) FROM album_photos GROUP BY album_id')
+            return dict(cursor.fetchall())
 
     # Album photo management
     def add_photo_to_album(self, album_id: int, photo_id: int, order_index: int = None) -> bool:
@@ -1278,159 +1533,381 @@ class PhotoDatabase:
         Returns:
             List of photo dictionaries, ordered by their position in the album
         """
-        cursor = self.conn.cursor()
-        cursor.execute(
-            '''
-            SELECT p.*, ap.order_index
-            FROM photos p
-                     JOIN album_photos ap ON p.id = ap.photo_id
-            WHERE ap.album_id = ?
-            ORDER BY ap.order_index
-            ''',
-            (album_id,)
-        )
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''
+                SELECT p.*, ap.order_index
+                FROM photos p
+                         JOIN album_photos ap ON p.id = ap.photo_id
+                WHERE ap.album_id = ?
+                ORDER BY ap.order_index
+                ''',
+                (album_id,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_albums_for_photo(self, photo_id: int) -> List[Dict]:
         """
         Get all albums containing a specific photo.
         
         Args:
+            photo_id: ID of the photo
+            
+        Returns:
+            List of album dictionaries
+        """
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''
+                SELECT a.* 
+                FROM albums a
+                JOIN album_photos ap ON a.id = ap.album_id
+                WHERE ap.photo_id = ?
+                ORDER BY a.name
+                ''',
+                (photo_id,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def find_duplicates(self, folder_id: int = None) -> List[Dict]:
+        """
+        Find and group photos with identical file hashes, leaving out trashed photos.
+
+        Args:
+            folder_id: Restrict the search to this folder (optional)
+
+        Returns:
+            List of dictionaries where each dictionary represents a group of duplicate photos.
+        """
+        folder_filter = 'AND folder_id = ?' if folder_id is not None else ''
+        params = (folder_id,) if folder_id is not None else ()
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f'''
+                SELECT file_hash, GROUP_CONCAT(id) AS photo_ids
+                FROM photos
+                WHERE file_hash IS NOT NULL AND COALESCE(is_trashed, 0) = 0 {folder_filter}
+                GROUP BY file_hash
+                HAVING COUNT(*) > 1
+                ''', params)
+        
+            duplicates = []
+            for row in cursor.fetchall():
+                duplicates.append({
+                    "file_hash": row["file_hash"],
+                    "photo_ids": row["photo_ids"].split(",")
+                })
+        
+            return duplicates
+
+    def get_duplicate_stats(self) -> Dict[str, int]:
+        """
+        Summarise the groups of photos with identical file hashes in one query.
+
+        Trashed photos are left out, as in find_duplicates.
+
+        Returns:
+            Dictionary with 'total_groups', 'total_duplicates' (photos beyond
+            the first of each group), 'wasted_space_bytes' (their file sizes)
+            and 'largest_group_size'.
+        """
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''
+                SELECT COUNT(*) AS total_groups,
+                       COALESCE(SUM(group_size - 1), 0) AS total_duplicates,
+                       COALESCE(SUM(wasted), 0) AS wasted_space_bytes,
+                       COALESCE(MAX(group_size), 0) AS largest_group_size
+                FROM (
+                    -- With MIN(id), the bare file_size is that of the group's
+                    -- first photo, the one not counted as wasted
+                    SELECT COUNT(*) AS group_size, MIN(id),
+                           COALESCE(SUM(file_size), 0) - COALESCE(file_size, 0) AS wasted
+                    FROM photos
+                    WHERE file_hash IS NOT NULL AND COALESCE(is_trashed, 0) = 0
+                    GROUP BY file_hash
+                    HAVING COUNT(*) > 1
+                )
+                ''')
+            return dict(cursor.fetchone())
+
+    def get_photos_with_shared_size(self, folder_id: int = None) -> List[Dict]:
+        """
+        Get photos whose file size matches at least one other photo.
+
+        Files of different sizes cannot be identical, so these are the only
+        candidates worth hashing when looking for duplicates by content.
+        Trashed photos are left out.
+
+        Args:
+            folder_id: Restrict the search to this folder (optional)
 
-    def find_duplicates(self) -> List[Dict]:
+        Returns:
+            List of photo dictionaries ordered by file size.
         """
-        Find and group
-        photos
-        with identical file hashes.
+        folder_filter = 'AND folder_id = ?' if folder_id is not None else ''
+        params = (folder_id, folder_id) if folder_id is not None else ()
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f'''
+                SELECT * FROM photos
+                WHERE file_size IN (
+                    SELECT file_size FROM photos
+                    WHERE file_size IS NOT NULL AND COALESCE(is_trashed, 0) = 0 {folder_filter}
+                    GROUP BY file_size
+                    HAVING COUNT(*) > 1
+                ) AND COALESCE(is_trashed, 0) = 0 {folder_filter}
+                ORDER BY file_size
+                ''', params)
+            return [dict(row) for row in cursor.fetchall()]
+
+    def move_to_trash(self, photo_id: int, trash_type: str = "application") -> bool:
+        """
+        Move a photo to the trash (application or system).
+
+        Args:
+            photo_id: ID of the photo to move to trash.
+            trash_type: Type of trash ('application' or 'system').
 
         Returns:
-        List
-        of
-        dictionaries
-        where
-        each
-        dictionary
-        represents
-        a
-        group
-        of
-        duplicate
-        photos.
-
-    """
-    cursor = self.conn.cursor()
-    cursor.execute(
-        '''
-        SELECT file_hash, GROUP_CONCAT(id) AS photo_ids
-        FROM photos
-        WHERE file_hash IS NOT NULL
-        GROUP BY file_hash
-        HAVING COUNT(*) > 1
-        ''')
-    
-    duplicates = []
-    for row in cursor.fetchall():
-        duplicates.append({
-            "file_hash": row["file_hash"],
-            "photo_ids": row["photo_ids"].split(",")
-        })
-    
-    return duplicates
-
-def move_to_trash(self, photo_id: int, trash_type: str = "application") -> bool:
-    """
-    Move
-    a
-    photo
-    to
-    the
-    trash(application or system).
-
-    Args:
-    photo_id: ID
-    of
-    the
-    photo
-    to
-    move
-    to
-    trash.
-    trash_type: Type
-    of
-    trash('application' or 'system').
-
-
-Returns:
-True if the
-operation
-was
-successful, False
-otherwise.
-"""
-cursor = self.conn.cursor()
-photo = self.get_photo_by_id(photo_id)
-if not photo:
-    return False
-
-file_path = photo["file_path"]
-
-try:
-    if trash_type == "application":
-        # Move to application trash (e.g., a dedicated folder)
-        trash_folder = os.path.join(os.path.dirname(self.conn.database), "app_trash")
-        os.makedirs(trash_folder, exist_ok=True)
-        os.rename(file_path, os.path.join(trash_folder, os.path.basename(file_path)))
-    elif trash_type == "system":
-        # Move to system trash (requires `send2trash` library)
-        from send2trash import send2trash
-        send2trash(file_path)
-    else:
-        raise ValueError("Invalid trash type")
-
-    # Update database to reflect the file is trashed
-    cursor.execute('UPDATE photos SET is_trashed = 1 WHERE id = ?', (photo_id,))
-    self.conn.commit()
-    return True
-except Exception as e:
-    logging.error(f"Failed to move photo {photo_id} to trash: {e}")
-    return False
-
-def permanently_delete_photo(self, photo_id: int) -> bool:
-"""
-Permanently
-delete
-a
-photo
-from the database and file
-system.
-
-Args:
-photo_id: ID
-of
-the
-photo
-to
-delete.
-
-Returns:
-True if the
-operation
-was
-successful, False
-otherwise.
-"""
-photo = self.get_photo_by_id(photo_id)
-if not photo:
-    return False
+            True if the operation was successful, False otherwise.
+        """
+        cursor = self.conn.cursor()
+        photo = self.get_photo(photo_id)
+        if not photo:
+            return False
+
+        file_path = photo["file_path"]
+
+        try:
+            if trash_type == "system":
+                # Move to system trash (requires `send2trash` library)
+                from send2trash import send2trash
+            elif trash_type != "application":
+                raise ValueError("Invalid trash type")
+
+            # Mark the photo as trashed in the same transaction as the move,
+            # so a failed move leaves the row untouched
+            with self.conn:
+                cursor.execute('UPDATE photos SET is_trashed = 1 WHERE id = ?', (photo_id,))
+                if trash_type == "application":
+                    # Move to application trash (e.g., a dedicated folder)
+                    os.makedirs(self.app_trash_path, exist_ok=True)
+                    os.rename(file_path, self._unique_trash_path(file_path))
+                else:
+                    send2trash(file_path)
+            return True
+        except Exception as e:
+            logger.error("Failed to move photo %s to trash: %s", photo_id, e)
+            return False
+
+    def _unique_trash_path(self, file_path: str) -> str:
+        """
+        Choose where a file goes in the application trash without replacing an earlier one.
+
+        Args:
+            file_path: Path of the file being trashed.
+
+        Returns:
+            Path in the application trash that does not exist yet.
+        """
+        stem, ext = os.path.splitext(os.path.basename(file_path))
+        target = os.path.join(self.app_trash_path, stem + ext)
+        counter = 1
+        while os.path.exists(target):
+            target = os.path.join(self.app_trash_path, f"{stem}_{counter}{ext}")
+            counter += 1
+        return target
+
+    def permanently_delete_photo(self, photo_id: int) -> bool:
+        """
+        Permanently delete a photo from the database and file system.
+
+        Args:
+            photo_id: ID of the photo to delete.
+
+        Returns:
+            True if the operation was successful, False otherwise.
+        """
+        photo = self.get_photo(photo_id)
+        if not photo:
+            return False
+
+        file_path = photo["file_path"]
+
+        try:
+            # Delete the file from the file system
+            os.remove(file_path)
+
+            # Remove the photo from the database
+            return self.delete_photo(photo_id)
+        except Exception as e:
+            logger.error("Failed to permanently delete photo %s: %s", photo_id, e)
+            return False
+
+    def get_photo_paths(self, photo_ids: List[int]) -> Dict[int, str]:
+        """
+        Get the file paths of several photos.
+
+        Args:
+            photo_ids: IDs of the photos to look up.
+
+        Returns:
+            Mapping of photo ID to file path for the photos that exist.
+        """
+        paths = {}
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(photo_ids), self.MAX_QUERY_VARIABLES):
+                chunk = photo_ids[start:start + self.MAX_QUERY_VARIABLES]
+                placeholders = ', '.join(['?'] * len(chunk))
+                cursor.execute(f'SELECT id, file_path FROM photos WHERE id IN ({placeholders})', chunk)
+                paths.update((row['id'], row['file_path']) for row in cursor.fetchall())
+        return paths
+
+    def move_photos_to_trash(self, photo_ids: List[int], trash_type: str = "application") -> int:
+        """
+        Move several photos to the trash, updating the database in one transaction.
+
+        Args:
+            photo_ids: IDs of the photos to move to trash.
+            trash_type: Type of trash ('application' or 'system').
+
+        Returns:
+            Number of photos moved to trash.
+        """
+        try:
+            if trash_type == "application":
+                os.makedirs(self.app_trash_path, exist_ok=True)
+            elif trash_type == "system":
+                from send2trash import send2trash
+            else:
+                logger.error("Invalid trash type: %s", trash_type)
+                return 0
+        except Exception as e:
+            logger.error("Failed to prepare the %s trash: %s", trash_type, e)
+            return 0
+
+        # Each row is marked in the same transaction as its file is moved;
+        # if the transaction fails, files moved to the application trash are
+        # moved back so no row is left pointing at a missing file
+        moved = []
+        try:
+            with self.conn:
+                cursor = self.conn.cursor()
+                for photo_id, file_path in self.get_photo_paths(photo_ids).items():
+                    try:
+                        if trash_type == "application":
+                            target = self._unique_trash_path(file_path)
+                            os.rename(file_path, target)
+                        else:
+                            target = None
+                            send2trash(file_path)
+                    except Exception as e:
+                        logger.error("Failed to move photo %s to trash: %s", photo_id, e)
+                        continue
+                    moved.append((file_path, target))
+                    cursor.execute('UPDATE photos SET is_trashed = 1 WHERE id = ?', (photo_id,))
+        except sqlite3.Error as e:
+            logger.error("Failed to mark %s photos as trashed: %s", len(moved), e)
+            for file_path, target in moved:
+                if target is None:
+                    continue
+                try:
+                    os.rename(target, file_path)
+                except OSError as restore_error:
+                    logger.error("Failed to restore %s from trash: %s", file_path, restore_error)
+            return 0
+        return len(moved)
+
+    def permanently_delete_photos(self, photo_ids: List[int]) -> int:
+        """
+        Permanently delete several photos, removing their rows in one transaction.
+
+        Args:
+            photo_ids: IDs of the photos to delete.
+
+        Returns:
+            Number of photos deleted.
+        """
+        deleted = []
+        for photo_id, file_path in self.get_photo_paths(photo_ids).items():
+            try:
+                os.remove(file_path)
+                deleted.append((photo_id,))
+            except Exception as e:
+                logger.error("Failed to permanently delete photo %s: %s", photo_id, e)
+
+        if not deleted:
+            return 0
+        cursor = self.conn.cursor()
+        cursor.executemany('DELETE FROM photos WHERE id = ?', deleted)
+        self.conn.commit()
+        return len(deleted)
 
-file_path = photo["file_path"]
+    def get_photos_with_perceptual_hash(self, limit: int = 100) -> List[Dict]:
+        """
+        Get photos that have a perceptual hash.
 
-try:
-    # Delete the file from the file system
-    os.remove(file_path)
+        Args:
+            limit: Maximum number of photos to return.
 
-    # Remove the photo from the database
-    return self.delete_photo(photo_id)
-except Exception as e:
-    logging.error(f"Failed to permanently delete photo {photo_id}: {e}")
-    return False
+        Returns:
+            List of photo dictionaries; perceptual_hash holds the raw hash bytes.
+        """
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT * FROM photos WHERE perceptual_hash IS NOT NULL AND COALESCE(is_trashed, 0) = 0 '
+                'ORDER BY id LIMIT ?',
+                (limit,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_photos_without_perceptual_hash(self, limit: int = 100) -> List[Dict]:
+        """
+        Get photos that do not have a perceptual hash yet.
+
+        Args:
+            limit: Maximum number of photos to return.
+
+        Returns:
+            List of photo dictionaries.
+        """
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT * FROM photos WHERE perceptual_hash IS NULL AND COALESCE(is_trashed, 0) = 0 '
+                'ORDER BY id LIMIT ?',
+                (limit,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def update_photo_perceptual_hashes(self, updates: List[Tuple[int, str]]) -> int:
+        """
+        Store perceptual hashes for several photos in one transaction.
+
+        Hashes are stored as raw bytes (32 bytes for a 256-bit hash) rather
+        than as hexadecimal text.
+
+        Args:
+            updates: (photo ID, hexadecimal perceptual hash) pairs.
+
+        Returns:
+            Number of photos updated.
+        """
+        if not updates:
+            return 0
+        try:
+            cursor = self.conn.cursor()
+            cursor.executemany('UPDATE photos SET perceptual_hash = ? WHERE id = ?',
+                               [(bytes.fromhex(perceptual_hash), photo_id)
+                                for photo_id, perceptual_hash in updates])
+            self.conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            logger.error("Failed to update perceptual hashes for %s photos: %s", len(updates), e)
+            return 0
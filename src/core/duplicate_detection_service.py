@@ -4,18 +4,133 @@ Duplicate detection service for Pixels photo manager.
 This module provides functionality to identify and manage duplicate photos.
 """
 
-import hashlib
 import logging
 import os
-from typing import Dict, List, Optional, Tuple, Any
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any, Union
 
 # Import libraries for perceptual hashing
 import imagehash
+import numpy as np
 from PIL import Image, UnidentifiedImageError
 from src.core.database import PhotoDatabase
+from src.core.hashing import (HASH_ALGORITHMS, HASH_BLOCK_SIZE, PREFIX_HASH_SIZE, STORED_HASH_ALGO, hash_file, hash_files,
+                              is_hash_current)
 
 logger = logging.getLogger(__name__)
 
+# Perceptual hashes are compared as 256-bit values (64 hex characters)
+PERCEPTUAL_HASH_BITS = 256
+
+# Rows of the pairwise distance matrix computed per step in find_similar_images
+SIMILARITY_BLOCK_ROWS = 256
+
+# Ratio of the downscaled image to the hash size, as imagehash.phash uses for its DCT
+PHASH_HIGHFREQ_FACTOR = 4
+
+# Photos handed to each worker process at a time in update_perceptual_hashes
+PERCEPTUAL_HASH_CHUNKSIZE = 8
+
+
+@lru_cache(maxsize=None)
+def _dct_basis(size: int) -> np.ndarray:
+    """
+    Get the matrix of the unnormalised type-II DCT that imagehash.phash applies.
+
+    Args:
+        size: Length of the transformed axis
+
+    Returns:
+        size x size matrix D, so that D @ x is the DCT of each column of x
+    """
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    return 2 * np.cos(np.pi * k * (2 * n + 1) / (2 * size))
+
+
+def _perceptual_hash(file_path: str, hash_size: int = 8) -> Optional[str]:
+    """
+    Calculate the combined perceptual hash of an image file.
+
+    Module-level so that it can be sent to worker processes; see
+    DuplicateDetectionService.calculate_perceptual_hash.
+
+    Args:
+        file_path: Path to the image file
+        hash_size: Size of each hash (default: 8, producing 64-bit hashes)
+
+    Returns:
+        Hexadecimal string of the four hashes concatenated, or None if failed
+    """
+    try:
+        with Image.open(file_path) as img:
+            # All four algorithms work on a small grayscale image. Convert and
+            # downscale once to the largest grid any of them needs (phash's),
+            # so each one only resizes a tiny image instead of the full photo.
+            grid_size = hash_size * PHASH_HIGHFREQ_FACTOR
+            if img.mode in ('RGBA', 'LA'):
+                # Keep the alpha channel through the downscale, then flatten
+                # the small image onto a white background
+                small = img.convert('LA').resize((grid_size, grid_size), Image.LANCZOS)
+                background = Image.new('L', small.size, 255)
+                background.paste(small.getchannel('L'), mask=small.getchannel('A'))
+                small = background
+            else:
+                small = img.convert('L').resize((grid_size, grid_size), Image.LANCZOS)
+
+            pixels = np.asarray(small, dtype=np.float64)
+
+            # Calculate different types of hashes
+            avg_hash = imagehash.average_hash(small, hash_size=hash_size)
+            d_hash = imagehash.dhash(small, hash_size=hash_size)
+
+            # Perceptual hash: imagehash.phash's 2D DCT as two products with a
+            # cached basis matrix
+            basis = _dct_basis(grid_size)
+            dct_low = (basis @ pixels @ basis.T)[:hash_size, :hash_size]
+            p_hash = imagehash.ImageHash(dct_low > np.median(dct_low))
+
+            # Wavelet hash: with a Haar wavelet and the lowest frequency removed
+            # (imagehash.whash's defaults), the low band of the grid is its block
+            # means less the overall mean, so compare the block means directly
+            block_means = pixels.reshape(hash_size, PHASH_HIGHFREQ_FACTOR,
+                                         hash_size, PHASH_HIGHFREQ_FACTOR).mean(axis=(1, 3))
+            w_hash = imagehash.ImageHash(block_means > np.median(block_means))
+
+            # Concatenate the raw hash bits. Hashing the result again would
+            # scramble it, and Hamming distance between the combined values
+            # must reflect how different the images actually look.
+            return str(avg_hash) + str(p_hash) + str(d_hash) + str(w_hash)
+    except (UnidentifiedImageError, IOError, OSError) as e:
+        logger.warning("Failed to calculate perceptual hash for %s: %s", file_path, e)
+        return None
+
+
+def _perceptual_hash_bytes(value: Any) -> Optional[bytes]:
+    """
+    Get the raw bytes of a stored perceptual hash.
+
+    Hashes are stored as BLOBs; hexadecimal strings written before that are
+    still accepted.
+
+    Args:
+        value: Stored hash (bytes or hexadecimal string)
+
+    Returns:
+        The hash as PERCEPTUAL_HASH_BITS // 8 bytes, or None if missing or malformed
+    """
+    if isinstance(value, str):
+        try:
+            value = bytes.fromhex(value)
+        except ValueError:
+            return None
+    if not isinstance(value, (bytes, bytearray, memoryview)) or len(value) != PERCEPTUAL_HASH_BITS // 8:
+        return None
+    return bytes(value)
+
+
 
 class DuplicateDetectionService:
     """
@@ -25,47 +140,80 @@ class DuplicateDetectionService:
     using both exact file hash matching and perceptual hashing.
     """
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, hash_algo: str = STORED_HASH_ALGO,
+                 db: Optional[PhotoDatabase] = None):
         """
         Initialize the duplicate detection service.
         
         Args:
             db_path: Path to the database file. If None, uses the default path.
+            hash_algo: Algorithm used to hash file contents (see HASH_ALGORITHMS)
+            db: Database to use instead of opening one from db_path
+        """
+        if hash_algo not in HASH_ALGORITHMS:
+            raise ValueError(f"Unsupported hash algorithm: {hash_algo}")
+        self.db = db if db is not None else PhotoDatabase(db_path)
+        self.hash_algo = hash_algo
+        # Duplicate groups by folder ID (None for the whole library), valid
+        # while the database revision is _duplicates_cache_revision
+        self._duplicates_cache: Dict[Optional[int], List[Dict[str, Any]]] = {}
+        self._duplicates_cache_revision: Optional[Tuple[int, int]] = None
+
+    def _cached_duplicates(self, folder_id: Optional[int]) -> List[Dict[str, Any]]:
+        """
+        Get the duplicate groups of a folder or the whole library, reusing
+        the last result until the database changes.
+
+        Args:
+            folder_id: ID of the folder, or None for the whole library
+
+        Returns:
+            List of duplicate photo groups
         """
-        self.db = PhotoDatabase(db_path)
+        revision = self.db.get_revision()
+        if revision != self._duplicates_cache_revision:
+            self._duplicates_cache = {}
+            self._duplicates_cache_revision = revision
+
+        duplicates = self._duplicates_cache.get(folder_id)
+        if duplicates is None:
+            duplicates = list(self._iter_duplicate_groups(self.db.find_duplicates(folder_id)))
+            self._duplicates_cache[folder_id] = duplicates
+        return duplicates
 
     def find_exact_duplicates(self) -> List[Dict[str, Any]]:
         """
         Find groups of photos with identical file hashes.
         
+        The result is reused until the database changes, so a scan followed
+        by a statistics request only queries once. Callers must not modify
+        the returned groups.
+
         Returns:
             List of dictionaries where each dictionary represents a group of duplicate photos.
             Each dictionary contains 'file_hash' and 'photos' keys.
         """
-        db_results = self.db.find_duplicates()
+        return self._cached_duplicates(None)
 
-        # Enhance results with full photo information
-        duplicates = []
-        for group in db_results:
-            photo_ids = [int(id_str) for id_str in group["photo_ids"]]
-            photos = []
-
-            for photo_id in photo_ids:
-                photo_info = self.db.get_photo(photo_id)
-                if photo_info:
-                    photos.append(photo_info)
+    def iter_exact_duplicates(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield groups of photos with identical file hashes one at a time.
 
-            if len(photos) > 1:  # Only include groups with at least 2 photos
-                duplicates.append({
-                    "file_hash": group["file_hash"],
-                    "photos": photos
-                })
+        Unlike find_exact_duplicates, only the photos of the groups being
+        yielded are held in memory, so reductions over every group stay
+        small however many duplicates the library has.
 
-        return duplicates
+        Yields:
+            Dictionaries with 'file_hash' and 'photos' keys
+        """
+        return self._iter_duplicate_groups(self.db.find_duplicates())
 
     def find_duplicates_in_folder(self, folder_id: int) -> List[Dict[str, Any]]:
         """
         Find duplicate photos within a specific folder.
+
+        Like find_exact_duplicates, the result is reused until the database
+        changes and must not be modified.
         
         Args:
             folder_id: ID of the folder to scan for duplicates
@@ -73,45 +221,137 @@ class DuplicateDetectionService:
         Returns:
             List of duplicate photo groups
         """
-        # Get all photos in the folder
-        photos = self.db.get_photos_by_folder(folder_id)
+        return self._cached_duplicates(folder_id)
+
+    def _iter_duplicate_groups(self, db_results: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield grouped database rows with their photo IDs replaced by full photo information.
+
+        Photos are fetched for a batch of groups at a time, with about
+        MAX_QUERY_VARIABLES IDs per batch.
+
+        Args:
+            db_results: Groups from PhotoDatabase.find_duplicates
+
+        Yields:
+            Groups with 'file_hash' and 'photos' keys
+        """
+        def load(groups, photo_ids):
+            photos_by_id = self.db.get_photos(photo_ids)
+            for group in groups:
+                photos = [photos_by_id[photo_id]
+                          for photo_id in map(int, group["photo_ids"])
+                          if photo_id in photos_by_id]
+
+                if len(photos) > 1:  # Only include groups with at least 2 photos
+                    yield {
+                        "file_hash": group["file_hash"],
+                        "photos": photos
+                    }
+
+        batch, batch_ids = [], []
+        for group in db_results:
+            batch.append(group)
+            batch_ids.extend(int(id_str) for id_str in group["photo_ids"])
+            if len(batch_ids) >= self.db.MAX_QUERY_VARIABLES:
+                yield from load(batch, batch_ids)
+                batch, batch_ids = [], []
+        if batch:
+            yield from load(batch, batch_ids)
+
+    def find_content_duplicates(self, folder_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Find duplicate photos by checking their files on disk instead of trusting stored hashes.
+
+        Photos are first grouped by file size, so only files that share a size
+        with another photo are considered. When the service uses the indexer's
+        algorithm, unchanged files reuse their stored hash. The rest are
+        hashed in two tiers with the service's hash_algo: first only their
+        first PREFIX_HASH_SIZE bytes, then in full only if another file of
+        the same size has the same prefix. Files are hashed concurrently,
+        one file per thread.
+
+        Args:
+            folder_id: Restrict the search to this folder (optional)
+
+        Returns:
+            List of duplicate photo groups with 'file_hash' and 'photos' keys
+        """
+        candidates = self.db.get_photos_with_shared_size(folder_id)
+        file_hashes = [None] * len(candidates)
+        sizes = {}
+        stale = []
+        for i, photo in enumerate(candidates):
+            try:
+                stat = os.stat(photo["file_path"])
+            except OSError as e:
+                logger.warning("Could not hash %s: %s", photo["file_path"], e)
+                continue
+            sizes[i] = stat.st_size
+            if self.hash_algo == STORED_HASH_ALGO and is_hash_current(photo, stat):
+                file_hashes[i] = photo["file_hash"]
+            else:
+                stale.append(i)
+
+        # Prefix-hash every readable file of the same size as a stale one
+        stale_sizes = {sizes[i] for i in stale}
+        probed = [i for i, size in sizes.items() if size in stale_sizes]
+        prefixes = hash_files([candidates[i]["file_path"] for i in probed], self.hash_algo,
+                              prefix_size=PREFIX_HASH_SIZE)
+        prefix_groups = {}
+        for i, prefix in zip(probed, prefixes):
+            if prefix is not None:
+                prefix_groups.setdefault((sizes[i], prefix), []).append(i)
+
+        # Fully hash stale files whose prefix another file shares; files no
+        # larger than the prefix were already hashed whole
+        full = []
+        for (size, prefix), group in prefix_groups.items():
+            if len(group) < 2:
+                continue
+            for i in group:
+                if file_hashes[i] is not None:
+                    continue
+                if size <= PREFIX_HASH_SIZE:
+                    file_hashes[i] = prefix
+                else:
+                    full.append(i)
+
+        for i, file_hash in zip(full, hash_files([candidates[i]["file_path"] for i in full], self.hash_algo)):
+            file_hashes[i] = file_hash
 
-        # Group by file hash
         hash_groups = {}
-        for photo in photos:
-            file_hash = photo.get("file_hash")
-            if file_hash:
-                if file_hash not in hash_groups:
-                    hash_groups[file_hash] = []
-                hash_groups[file_hash].append(photo)
-
-        # Filter for groups with more than one photo
-        duplicates = []
-        for file_hash, photos in hash_groups.items():
-            if len(photos) > 1:
-                duplicates.append({
-                    "file_hash": file_hash,
-                    "photos": photos
-                })
+        for photo, file_hash in zip(candidates, file_hashes):
+            if file_hash is not None:
+                hash_groups.setdefault(file_hash, []).append(photo)
 
-        return duplicates
+        return [{"file_hash": file_hash, "photos": photos}
+                for file_hash, photos in hash_groups.items() if len(photos) > 1]
 
-    def calculate_file_hash(self, file_path: str, block_size: int = 65536) -> str:
+    def calculate_file_hash(self, file_path: str, block_size: int = HASH_BLOCK_SIZE) -> str:
         """
-        Calculate SHA-256 hash of a file for deduplication purposes.
+        Calculate the hash of a file for deduplication purposes.
+
+        If the file is an indexed photo that is unchanged since it was hashed
+        with the service's algorithm, the stored hash is returned without
+        reading the file.
         
         Args:
             file_path: Path to the file
-            block_size: Size of blocks to read
+            block_size: Size of blocks to read when the file cannot be memory-mapped
             
         Returns:
-            Hexadecimal string representation of the hash
+            Hexadecimal string representation of the hash (STORED_HASH_ALGO by default)
         """
-        hasher = hashlib.sha256()
-        with open(file_path, 'rb') as f:
-            for block in iter(lambda: f.read(block_size), b''):
-                hasher.update(block)
-        return hasher.hexdigest()
+        if self.hash_algo == STORED_HASH_ALGO:
+            try:
+                photo = self.db.get_photo_by_path(file_path)
+            except sqlite3.Error as e:
+                logger.warning("Could not look up stored hash of %s: %s", file_path, e)
+                photo = None
+            if photo and is_hash_current(photo, os.stat(file_path)):
+                return photo["file_hash"]
+        return hash_file(file_path, self.hash_algo, block_size)
 
     def calculate_perceptual_hash(self, file_path: str, hash_size: int = 8) -> Optional[str]:
         """
@@ -128,34 +368,10 @@ class DuplicateDetectionService:
             hash_size: Size of the hash (default: 8, producing 64-bit hashes)
             
         Returns:
-            Hexadecimal string representation of the combined hash, or None if failed
+            Hexadecimal string of the four hashes concatenated (64 characters,
+            256 bits, for the default hash_size), or None if failed
         """
-        try:
-            with Image.open(file_path) as img:
-                # Convert to RGB mode if the image has an alpha channel
-                if img.mode == 'RGBA':
-                    # Create a white background
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    # Paste the image on the background
-                    background.paste(img, mask=img.split()[3])  # 3 is the alpha channel
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-
-                # Calculate different types of hashes
-                avg_hash = imagehash.average_hash(img, hash_size=hash_size)
-                p_hash = imagehash.phash(img, hash_size=hash_size)
-                d_hash = imagehash.dhash(img, hash_size=hash_size)
-                w_hash = imagehash.whash(img, hash_size=hash_size)
-
-                # Combine the hashes (simple concatenation)
-                combined = str(avg_hash) + str(p_hash) + str(d_hash) + str(w_hash)
-
-                # Create a single hash from the combined string
-                return hashlib.sha256(combined.encode()).hexdigest()
-        except (UnidentifiedImageError, IOError, OSError) as e:
-            logger.warning(f"Failed to calculate perceptual hash for {file_path}: {e}")
-            return None
+        return _perceptual_hash(file_path, hash_size)
 
     def find_similar_images(self, threshold: float = 0.9, limit: int = 100) -> List[Dict[str, Any]]:
         """
@@ -171,73 +387,75 @@ class DuplicateDetectionService:
         # Get photos that have perceptual hash values
         photos = self.db.get_photos_with_perceptual_hash(limit=limit)
 
-        # Group similar photos
-        similarity_groups = []
-        processed_ids = set()
-
-        for i, photo1 in enumerate(photos):
-            if photo1['id'] in processed_ids:
+        # Decode every hash once into four 64-bit words per photo. Photos
+        # with a missing or malformed hash never match anything.
+        words_per_hash = PERCEPTUAL_HASH_BITS // 64
+        hashes = np.zeros((len(photos), words_per_hash), dtype=np.uint64)
+        valid = np.zeros(len(photos), dtype=bool)
+        for index, photo in enumerate(photos):
+            p_hash = _perceptual_hash_bytes(photo.get('perceptual_hash'))
+            if p_hash is None:
                 continue
+            hashes[index] = np.frombuffer(p_hash, dtype='>u8')
+            valid[index] = True
+
+        # Group similar photos: each unprocessed photo collects every later
+        # unprocessed photo within the threshold. Pairwise Hamming distances
+        # are computed a block of rows at a time to bound memory, and only
+        # against the block's own and later photos (the upper triangle),
+        # since a photo is never compared with an earlier one.
+        similarity_groups = []
+        processed = np.zeros(len(photos), dtype=bool)
 
-            similar_photos = [photo1]
-            processed_ids.add(photo1['id'])
+        for start in range(0, len(photos), SIMILARITY_BLOCK_ROWS):
+            block = hashes[start:start + SIMILARITY_BLOCK_ROWS]
+            distances = np.bitwise_count(block[:, None, :] ^ hashes[None, start:, :]).sum(axis=-1)
+            matches = (1.0 - distances / PERCEPTUAL_HASH_BITS >= threshold) & valid[None, start:]
 
-            p_hash1 = photo1.get('perceptual_hash')
-            if not p_hash1:
-                continue
-
-            # Compare with all other unprocessed photos
-            for j in range(i + 1, len(photos)):
-                photo2 = photos[j]
-                if photo2['id'] in processed_ids:
+            for offset in range(len(block)):
+                i = start + offset
+                if processed[i]:
                     continue
-
-                p_hash2 = photo2.get('perceptual_hash')
-                if not p_hash2:
+                processed[i] = True
+                if not valid[i]:
                     continue
 
-                # Calculate similarity based on perceptual hash difference
-                similarity = self.calculate_hash_similarity(p_hash1, p_hash2)
-
-                if similarity >= threshold:
-                    similar_photos.append(photo2)
-                    processed_ids.add(photo2['id'])
-
-            # Only add groups with more than one photo
-            if len(similar_photos) > 1:
-                similarity_groups.append({
-                    'similarity': threshold,
-                    'photos': similar_photos
-                })
+                row = matches[offset, offset + 1:] & ~processed[i + 1:]
+                similar = np.flatnonzero(row) + i + 1
+                if len(similar):
+                    processed[similar] = True
+                    similarity_groups.append({
+                        'similarity': threshold,
+                        'photos': [photos[i]] + [photos[j] for j in similar]
+                    })
 
         return similarity_groups
 
-    def calculate_hash_similarity(self, hash1: str, hash2: str) -> float:
+    def calculate_hash_similarity(self, hash1: Union[bytes, str], hash2: Union[bytes, str]) -> float:
         """
         Calculate the similarity between two perceptual hashes.
         
         Args:
-            hash1: First hash string
-            hash2: Second hash string
+            hash1: First hash (raw bytes or hexadecimal string)
+            hash2: Second hash (raw bytes or hexadecimal string)
             
         Returns:
             Similarity score between 0.0 (completely different) and 1.0 (identical)
         """
-        # For SHA-256 hashes, we need to compare bit by bit
-        # Convert hashes to binary representation
-        try:
-            h1_int = int(hash1, 16)
-            h2_int = int(hash2, 16)
+        # Compare the concatenated perceptual hashes bit by bit
+        hash1 = _perceptual_hash_bytes(hash1)
+        hash2 = _perceptual_hash_bytes(hash2)
+        if hash1 is None or hash2 is None:
+            return 0.0
 
-            # Calculate Hamming distance (number of different bits)
-            xor_result = h1_int ^ h2_int
-            hamming_distance = bin(xor_result).count('1')
+        h1_int = int.from_bytes(hash1, 'big')
+        h2_int = int.from_bytes(hash2, 'big')
 
-            # Calculate similarity (1.0 means identical)
-            # SHA-256 produces 256-bit hashes
-            return 1.0 - (hamming_distance / 256)
-        except (ValueError, TypeError):
-            return 0.0
+        # Calculate Hamming distance (number of different bits)
+        hamming_distance = (h1_int ^ h2_int).bit_count()
+
+        # Calculate similarity (1.0 means identical)
+        return 1.0 - (hamming_distance / PERCEPTUAL_HASH_BITS)
 
     def scan_and_index_folder(self, folder_path: str) -> Tuple[int, int]:
         """
@@ -250,20 +468,15 @@ class DuplicateDetectionService:
             Tuple of (number of images processed, number of duplicates found)
         """
         from src.core.library_indexer import LibraryIndexer
-        from src.core.thumbnail_service import ThumbnailService
 
-        # Initialize required services
-        thumbnail_service = ThumbnailService()
-        indexer = LibraryIndexer(db_path=self.db.db_path, thumbnail_service=thumbnail_service)
+        # Index through this service's database rather than opening another
+        indexer = LibraryIndexer(db=self.db)
 
         # Index the folder
         folders_added, photos_added, _ = indexer.index_folder(folder_path, recursive=True)
 
-        # Find duplicates after indexing
-        duplicates = self.find_exact_duplicates()
-        duplicate_count = sum(len(group["photos"]) - 1 for group in duplicates)
-
-        return photos_added, duplicate_count
+        # Count duplicates after indexing from the stored hashes alone
+        return photos_added, self.db.get_duplicate_stats()["total_duplicates"]
 
     def delete_duplicate(self, photo_id: int, permanent: bool = False) -> bool:
         """
@@ -281,6 +494,24 @@ class DuplicateDetectionService:
         else:
             return self.db.move_to_trash(photo_id)
 
+    def delete_duplicates_bulk(self, photo_ids: List[int], permanent: bool = False) -> int:
+        """
+        Delete several duplicate photos with one database transaction.
+
+        Args:
+            photo_ids: IDs of the photos to delete
+            permanent: If True, permanently delete the files; if False, move to trash
+
+        Returns:
+            Number of photos deleted
+        """
+        if not photo_ids:
+            return 0
+        if permanent:
+            return self.db.permanently_delete_photos(photo_ids)
+        else:
+            return self.db.move_photos_to_trash(photo_ids)
+
     def suggest_duplicates_to_keep(self, duplicate_group: Dict[str, Any]) -> List[int]:
         """
         Suggest which photos to keep from a group of duplicates based on quality metrics.
@@ -297,54 +528,54 @@ class DuplicateDetectionService:
         Returns:
             List of photo IDs ordered by suggested priority to keep
         """
-        photos = duplicate_group["photos"]
-
-        # Create a list of (photo, score) tuples
-        scored_photos = []
-
-        for photo in photos:
-            score = 0
+        def score(photo):
+            get = photo.get
 
             # Higher resolution gets more points
-            width = photo.get("width", 0) or 0
-            height = photo.get("height", 0) or 0
-            score += width * height
+            points = (get("width") or 0) * (get("height") or 0)
 
             # More complete metadata is better
-            if photo.get("date_taken"):
-                score += 10
-            if photo.get("camera_make") and photo.get("camera_model"):
-                score += 5
-            if photo.get("iso") or photo.get("aperture") or photo.get("exposure_time"):
-                score += 5
+            if get("date_taken"):
+                points += 10
+            if get("camera_make") and get("camera_model"):
+                points += 5
+            if get("iso") or get("aperture") or get("exposure_time"):
+                points += 5
 
             # Rating and favorites get bonus points
-            score += (photo.get("rating", 0) or 0) * 20
-            if photo.get("is_favorite"):
-                score += 50
+            points += (get("rating") or 0) * 20
+            if get("is_favorite"):
+                points += 50
+            return points
 
-            scored_photos.append((photo, score))
+        # Sort photos by score (descending); the sort is stable, so ties keep
+        # the group's order
+        return [photo["id"] for photo in sorted(duplicate_group["photos"], key=score, reverse=True)]
 
-        # Sort photos by score (descending)
-        scored_photos.sort(key=lambda x: x[1], reverse=True)
-
-        # Return the sorted photo IDs
-        return [photo["id"] for photo, _ in scored_photos]
-
-    def get_duplicate_statistics(self) -> Dict[str, Any]:
+    def get_duplicate_statistics(self, duplicate_groups: Optional[Iterable[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Get statistics about duplicates in the library.
         
+        Args:
+            duplicate_groups: Groups already found by the caller; if None, the
+                library's exact duplicates are summarised by the database
+                without loading their photos
+        
         Returns:
             Dictionary with statistics about duplicates
         """
-        duplicate_groups = self.find_exact_duplicates()
+        if duplicate_groups is None:
+            stats = self.db.get_duplicate_stats()
+            stats["wasted_space_mb"] = stats["wasted_space_bytes"] / (1024 * 1024)
+            return stats
 
+        total_groups = 0
         total_duplicates = 0
         duplicate_file_sizes = 0
         largest_group_size = 0
 
         for group in duplicate_groups:
+            total_groups += 1
             group_size = len(group["photos"])
             # Count all but one photo in each group as duplicates
             total_duplicates += group_size - 1
@@ -358,7 +589,7 @@ class DuplicateDetectionService:
             largest_group_size = max(largest_group_size, group_size)
 
         return {
-            "total_groups": len(duplicate_groups),
+            "total_groups": total_groups,
             "total_duplicates": total_duplicates,
             "wasted_space_bytes": duplicate_file_sizes,
             "wasted_space_mb": duplicate_file_sizes / (1024 * 1024),
@@ -377,15 +608,19 @@ class DuplicateDetectionService:
         """
         # Get photos without perceptual hashes
         photos = self.db.get_photos_without_perceptual_hash(limit=limit)
-
-        updates = 0
-        for photo in photos:
-            file_path = photo.get('file_path')
-            if file_path and os.path.exists(file_path):
-                perceptual_hash = self.calculate_perceptual_hash(file_path)
-                if perceptual_hash:
-                    success = self.db.update_photo_perceptual_hash(photo['id'], perceptual_hash)
-                    if success:
-                        updates += 1
-
-        return updates
+        photos = [photo for photo in photos
+                  if photo.get('file_path') and os.path.exists(photo['file_path'])]
+        if not photos:
+            return 0
+
+        # Decoding and hashing is CPU-bound and independent per image, so
+        # spread it across processes and write the results back in one go
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            hashes = executor.map(_perceptual_hash,
+                                  [photo['file_path'] for photo in photos],
+                                  chunksize=PERCEPTUAL_HASH_CHUNKSIZE)
+            updates = [(photo['id'], perceptual_hash)
+                       for photo, perceptual_hash in zip(photos, hashes)
+                       if perceptual_hash]
+
+        return self.db.update_photo_perceptual_hashes(updates)
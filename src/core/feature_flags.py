@@ -3,6 +3,7 @@ Feature Flag System for Pixels Photo Manager
 This module manages feature flags to enable or disable features during development and testing.
 """
 
+import atexit
 import json
 import logging
 import os
@@ -45,6 +46,13 @@ DEFAULT_FEATURE_FLAGS = {
 class FeatureFlags:
     """
     Feature flag management system that controls which features are enabled or disabled.
+
+    Every known flag is also exposed as a boolean attribute of the same name
+    (e.g. ``flags.parallel_processing``), kept in step with enable, disable
+    and set_flags, so hot paths can read a flag without a method call.
+
+    enable and disable only change the flags in memory; the configuration
+    file is written by flush, which set_flags calls and which also runs at exit.
     
     Attributes:
         _flags (Dict[str, Any]): Dictionary of feature flags
@@ -62,29 +70,37 @@ class FeatureFlags:
         """Initialize the feature flags with default values and load from config if available."""
         self._config_path = config_path or DEFAULT_CONFIG_PATH
         self._flags = DEFAULT_FEATURE_FLAGS.copy()
+        self._dirty = False
         self._load()
+        self._update_attributes()
+        atexit.register(self.flush)
+
+    def _update_attributes(self) -> None:
+        """Expose each flag as a boolean attribute of the same name."""
+        for flag_name, value in self._flags.items():
+            setattr(self, flag_name, bool(value))
 
     def _load(self) -> None:
         """Load feature flags from configuration file."""
         try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(self._config_path), exist_ok=True)
-
-            # Load configuration if exists
-            if os.path.exists(self._config_path):
+            # Open the configuration directly; only a missing file needs the
+            # directory check and a fresh default file
+            try:
                 with open(self._config_path, 'r') as f:
                     loaded_flags = json.load(f)
-                    # Update only existing flags
-                    for key in self._flags.keys():
-                        if key in loaded_flags:
-                            self._flags[key] = loaded_flags[key]
-                logger.info(f"Feature flags loaded from {self._config_path}")
-            else:
+            except FileNotFoundError:
                 # Create default configuration file if it doesn't exist
                 self._save()
-                logger.info(f"Created default feature flags at {self._config_path}")
+                logger.info("Created default feature flags at %s", self._config_path)
+                return
+
+            # Update only existing flags
+            for key in self._flags.keys():
+                if key in loaded_flags:
+                    self._flags[key] = loaded_flags[key]
+            logger.info("Feature flags loaded from %s", self._config_path)
         except Exception as e:
-            logger.error(f"Error loading feature flags: {e}")
+            logger.error("Error loading feature flags: %s", e)
 
     def _save(self) -> None:
         """Save feature flags to configuration file."""
@@ -92,11 +108,27 @@ class FeatureFlags:
             # Ensure directory exists
             os.makedirs(os.path.dirname(self._config_path), exist_ok=True)
 
-            with open(self._config_path, 'w') as f:
+            # Write a temporary file and swap it in, so readers never see a partial file
+            temp_path = self._config_path + ".tmp"
+            with open(temp_path, 'w') as f:
                 json.dump(self._flags, f, indent=4)
-            logger.info(f"Feature flags saved to {self._config_path}")
+            os.replace(temp_path, self._config_path)
+            self._dirty = False
+            logger.info("Feature flags saved to %s", self._config_path)
         except Exception as e:
-            logger.error(f"Error saving feature flags: {e}")
+            logger.error("Error saving feature flags: %s", e)
+
+    def flush(self) -> None:
+        """Save feature flags to the configuration file if they changed since the last save."""
+        if self._dirty:
+            self._save()
+
+    def _set(self, flag_name: str, value: bool) -> None:
+        """Change a known flag in memory, marking the flags unsaved if its value changed."""
+        if self._flags[flag_name] != value:
+            self._flags[flag_name] = value
+            setattr(self, flag_name, value)
+            self._dirty = True
 
     def is_enabled(self, flag_name: str) -> bool:
         """
@@ -109,35 +141,33 @@ class FeatureFlags:
             bool: True if the flag is enabled, False otherwise
         """
         if flag_name not in self._flags:
-            logger.warning(f"Unknown feature flag: {flag_name}, returning False")
+            logger.warning("Unknown feature flag: %s, returning False", flag_name)
             return False
         return bool(self._flags[flag_name])
 
     def enable(self, flag_name: str) -> None:
         """
-        Enable a feature flag.
+        Enable a feature flag in memory; flush() saves the change.
         
         Args:
             flag_name: The name of the flag to enable
         """
         if flag_name in self._flags:
-            self._flags[flag_name] = True
-            self._save()
+            self._set(flag_name, True)
         else:
-            logger.warning(f"Attempted to enable unknown feature flag: {flag_name}")
+            logger.warning("Attempted to enable unknown feature flag: %s", flag_name)
 
     def disable(self, flag_name: str) -> None:
         """
-        Disable a feature flag.
+        Disable a feature flag in memory; flush() saves the change.
         
         Args:
             flag_name: The name of the flag to disable
         """
         if flag_name in self._flags:
-            self._flags[flag_name] = False
-            self._save()
+            self._set(flag_name, False)
         else:
-            logger.warning(f"Attempted to disable unknown feature flag: {flag_name}")
+            logger.warning("Attempted to disable unknown feature flag: %s", flag_name)
 
     def get_all_flags(self) -> Dict[str, Any]:
         """
@@ -150,17 +180,17 @@ class FeatureFlags:
 
     def set_flags(self, flags: Dict[str, Any]) -> None:
         """
-        Set multiple feature flags at once.
+        Set multiple feature flags at once and save them.
         
         Args:
             flags: Dictionary of flag name to value mappings
         """
         for flag_name, value in flags.items():
             if flag_name in self._flags:
-                self._flags[flag_name] = bool(value)
+                self._set(flag_name, bool(value))
             else:
-                logger.warning(f"Attempted to set unknown feature flag: {flag_name}")
-        self._save()
+                logger.warning("Attempted to set unknown feature flag: %s", flag_name)
+        self.flush()
 
 
 # Convenience function to get the feature flags instance
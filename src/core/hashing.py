@@ -0,0 +1,210 @@
+"""
+File content hashing for Pixels photo manager.
+
+This module provides the file hashing shared by the library indexer and the
+duplicate detection service.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import platform
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Supported file content hash algorithms. hashlib's SHA-256 is OpenSSL's,
+# which uses the CPU's SHA instructions (x86 SHA-NI, ARMv8 SHA2) when present;
+# without them BLAKE2b is markedly faster on 64-bit CPUs.
+HASH_ALGORITHMS = {
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+}
+
+
+def _cpu_has_sha_extensions() -> bool:
+    """
+    Check whether the CPU has SHA-256 instructions.
+
+    Returns:
+        True if x86 SHA-NI or ARMv8 SHA2 is reported, False if not or unknown
+    """
+    if sys.platform == "darwin" and platform.machine() == "arm64":
+        return True
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith(("flags", "Features")):
+                    return not {"sha_ni", "sha2"}.isdisjoint(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return False
+
+
+CPU_HAS_SHA_EXTENSIONS = _cpu_has_sha_extensions()
+
+# Fastest available algorithm, for throwaway comparisons whose hashes are
+# never stored (it depends on the CPU and on the optional packages installed).
+# With SHA instructions, OpenSSL's SHA-256 outruns BLAKE2b (about 1.2 GB/s vs
+# 450 MB/s on a SHA-NI x86 core).
+FAST_HASH_ALGO = "sha256" if CPU_HAS_SHA_EXTENSIONS else "blake2b"
+
+# BLAKE3 (SIMD, and its tree mode hashes one large file on all cores) when
+# the optional package is installed
+try:
+    import blake3
+    HASH_ALGORITHMS["blake3"] = partial(blake3.blake3, max_threads=blake3.blake3.AUTO)
+    FAST_HASH_ALGO = "blake3"
+except ImportError:
+    pass
+
+# xxHash3 (non-cryptographic, memory-bandwidth bound) when the optional package is installed;
+# 128 bits keeps accidental collisions out of reach for deduplication
+try:
+    import xxhash
+    HASH_ALGORITHMS["xxh3_128"] = xxhash.xxh3_128
+    FAST_HASH_ALGO = "xxh3_128"
+except ImportError:
+    pass
+
+# Algorithm of the file_hash stored for each photo by the library indexer.
+# It is fixed rather than FAST_HASH_ALGO so that every environment sharing a
+# library stores comparable hashes; SHA-256 is always available and matches
+# the rows indexed before hash_algo was recorded. Each photo records its
+# hash_algo, and rows hashed with another one are rehashed on the next scan.
+STORED_HASH_ALGO = "sha256"
+
+# Algorithm of rows indexed before hash_algo was recorded
+LEGACY_HASH_ALGO = "sha256"
+
+# Read size for file hashing; large reads keep the per-block Python overhead small
+HASH_BLOCK_SIZE = 1 << 20
+
+# Bytes hashed by hash_file_prefix; files that differ almost always differ this early
+PREFIX_HASH_SIZE = 1 << 16
+
+# Read-ahead hints for mapped files; not available on every platform
+_MADV_SEQUENTIAL = getattr(mmap, 'MADV_SEQUENTIAL', None)
+_MADV_WILLNEED = getattr(mmap, 'MADV_WILLNEED', None)
+
+# Mapped files at least this large are also prefetched as a whole
+PREFETCH_THRESHOLD = 1 << 20
+
+# Threads used by hash_files; the hashers release the GIL, so files hash on every core
+HASH_WORKERS = os.cpu_count() or 1
+
+
+def hash_file(file_path: str, algo: str = "sha256", block_size: int = HASH_BLOCK_SIZE) -> str:
+    """
+    Calculate the hash of a file's contents.
+
+    The file is memory-mapped and handed to the hasher in one call, so
+    the kernel streams pages straight into it; files of PREFETCH_THRESHOLD
+    bytes or more are prefetched up front. Files that cannot be
+    mapped (empty or special files) are read in blocks into one reused
+    buffer instead.
+
+    Args:
+        file_path: Path to the file
+        algo: Hash algorithm (see HASH_ALGORITHMS)
+        block_size: Size of blocks to read when the file cannot be mapped
+
+    Returns:
+        Hexadecimal string representation of the hash
+    """
+    hasher = HASH_ALGORITHMS[algo]()
+    with open(file_path, 'rb', buffering=0) as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            mapped = None
+
+        if mapped is not None:
+            with mapped:
+                if _MADV_SEQUENTIAL is not None:
+                    mapped.madvise(_MADV_SEQUENTIAL)
+                if _MADV_WILLNEED is not None and len(mapped) >= PREFETCH_THRESHOLD:
+                    mapped.madvise(_MADV_WILLNEED)
+                hasher.update(mapped)
+        else:
+            buffer = bytearray(block_size)
+            view = memoryview(buffer)
+            while True:
+                size = f.readinto(buffer)
+                if not size:
+                    break
+                hasher.update(view[:size])
+    return hasher.hexdigest()
+
+
+def hash_file_prefix(file_path: str, algo: str = "sha256", size: int = PREFIX_HASH_SIZE) -> str:
+    """
+    Calculate the hash of the start of a file.
+
+    Args:
+        file_path: Path to the file
+        algo: Hash algorithm (see HASH_ALGORITHMS)
+        size: Number of bytes to hash; smaller files are hashed whole
+
+    Returns:
+        Hexadecimal string representation of the hash
+    """
+    hasher = HASH_ALGORITHMS[algo]()
+    with open(file_path, 'rb') as f:
+        hasher.update(f.read(size))
+    return hasher.hexdigest()
+
+
+def is_hash_current(photo: Dict, stat_result: os.stat_result) -> bool:
+    """
+    Check whether a photo's stored file hash still describes the file on disk.
+
+    A file whose size, modification time and inode all match the values
+    recorded when it was hashed is taken to be unchanged, so its stored
+    hash can be reused without reading the file, as long as it was made
+    with STORED_HASH_ALGO.
+
+    Args:
+        photo: Photo dictionary from the database
+        stat_result: Current os.stat() of the photo's file
+
+    Returns:
+        True if the stored hash can be reused, False if the file must be rehashed
+    """
+    if not photo.get("file_hash") or (photo.get("hash_algo") or LEGACY_HASH_ALGO) != STORED_HASH_ALGO:
+        return False
+    return ((photo.get("file_size"), photo.get("file_mtime_ns"), photo.get("file_inode")) ==
+            (stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino))
+
+
+def hash_files(file_paths: List[str], algo: str = "sha256", max_workers: int = HASH_WORKERS,
+               prefix_size: Optional[int] = None) -> List[Optional[str]]:
+    """
+    Calculate the hashes of several files concurrently.
+
+    Args:
+        file_paths: Paths of the files
+        algo: Hash algorithm (see HASH_ALGORITHMS)
+        max_workers: Number of files hashed at the same time
+        prefix_size: Hash only this many bytes from the start of each file (optional)
+
+    Returns:
+        Hexadecimal hash of each file, in order, or None where the file could not be read
+    """
+    def hash_or_none(file_path):
+        try:
+            if prefix_size is not None:
+                return hash_file_prefix(file_path, algo, prefix_size)
+            return hash_file(file_path, algo)
+        except OSError as e:
+            logger.warning("Could not hash %s: %s", file_path, e)
+            return None
+
+    if max_workers <= 1 or len(file_paths) <= 1:
+        return [hash_or_none(file_path) for file_path in file_paths]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(hash_or_none, file_paths))
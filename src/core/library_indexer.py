@@ -5,7 +5,6 @@ This module coordinates the Scanner and Metadata Extractor components
 to populate the database with photos and their metadata.
 """
 
-import hashlib
 import logging
 import os
 import time
@@ -14,13 +13,15 @@ from typing import Dict, List, Tuple
 
 # Import our other components
 from .database import PhotoDatabase
+from .hashing import HASH_BLOCK_SIZE, STORED_HASH_ALGO, hash_file, is_hash_current
 from .metadata_extractor import MetadataExtractor
 from .scanner import FileSystemScanner
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# New photos are written to the database in batches of this many rows
+ADD_PHOTOS_BATCH_SIZE = 500
+
 
 class LibraryIndexer:
     """
@@ -30,22 +31,23 @@ class LibraryIndexer:
     to create and maintain the photo library index.
     """
 
-    def __init__(self, db_path: str = None, max_workers: int = 4):
+    def __init__(self, db_path: str = None, max_workers: int = 4, db: PhotoDatabase = None):
         """
         Initialize the library indexer.
         
         Args:
             db_path: Path to the database file (optional)
             max_workers: Maximum number of worker threads for parallel processing
+            db: Database to use instead of opening one from db_path (optional)
         """
-        self.db = PhotoDatabase(db_path)
+        self.db = db if db is not None else PhotoDatabase(db_path)
         self.scanner = FileSystemScanner()
         self.metadata_extractor = MetadataExtractor()
         self.max_workers = max_workers
 
     def index_folder(self, folder_path: str, recursive: bool = True, monitor: bool = False) -> Tuple[int, int, float]:
         """Index a folder with improved clarity and exception handling."""
-        start_time = time.time()
+        start_time = time.perf_counter()
         folders_added = 0
         photos_added = 0
         try:
@@ -62,10 +64,10 @@ class LibraryIndexer:
                 image_paths = [os.path.join(dir_path, fname) for fname in image_files]
                 photos_added += self._process_images(image_paths, current_folder_id)
         except Exception as exc:
-            logger.error(f"Indexing failed for {folder_path}: {exc}")
+            logger.error("Indexing failed for %s: %s", folder_path, exc)
             return 0, 0, 0.0
-        elapsed = time.time() - start_time
-        logger.info(f"Indexed folder '{folder_path}' in {elapsed:.2f}s, added {folders_added} folder(s), {photos_added} photo(s).")
+        elapsed = time.perf_counter() - start_time
+        logger.info("Indexed folder '%s' in %.2fs, added %s folder(s), %s photo(s).", folder_path, elapsed, folders_added, photos_added)
         return folders_added, photos_added, elapsed
 
     def refresh_index(self) -> Tuple[int, int, float]:
@@ -75,7 +77,7 @@ class LibraryIndexer:
         Returns:
             Tuple of (folders_updated, photos_added, time_taken)
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         folders_updated = 0
         photos_added = 0
 
@@ -94,31 +96,34 @@ class LibraryIndexer:
             self.db.update_folder(folder_id, date_scanned="datetime('now')")
             folders_updated += 1
 
-            # Get existing photos in this folder
-            existing_photos = self.db.get_photos_by_folder(folder_id)
-            existing_paths = {photo["file_path"] for photo in existing_photos}
-
             # Scan folder for current images
             scan_result = self.scanner.scan_directory(folder_path, recursive=False)
 
             for dir_path, image_files in scan_result.items():
                 current_paths = [os.path.join(dir_path, filename) for filename in image_files]
-                new_files = [path for path in current_paths if path not in existing_paths]
 
-                # Add new files to the database
-                if new_files:
-                    added = self._process_images(new_files, folder_id)
+                # Add new files to the database; photos already indexed are
+                # rehashed if their stored hash is stale (the file changed, or
+                # it was hashed with an algorithm other than STORED_HASH_ALGO)
+                if current_paths:
+                    added = self._process_images(current_paths, folder_id)
                     photos_added += added
 
-        elapsed_time = time.time() - start_time
-        logger.info(
-            f"Index refresh complete: {folders_updated} folders updated, {photos_added} new photos in {elapsed_time:.2f} seconds")
+        elapsed_time = time.perf_counter() - start_time
+        logger.info("Index refresh complete: %s folders updated, %s new photos in %.2f seconds",
+                    folders_updated, photos_added, elapsed_time)
 
         return (folders_updated, photos_added, elapsed_time)
 
     def _process_images(self, image_paths: List[str], folder_id: int) -> int:
         """
         Process a list of images and add them to the database.
+
+        The photos already indexed are looked up in one batch first. The
+        workers of a thread pool then only stat, read and hash files (the
+        hashing releases the GIL), while this thread applies their results
+        to the database: new photos are inserted ADD_PHOTOS_BATCH_SIZE at a
+        time, each batch in one transaction.
         
         Args:
             image_paths: List of image file paths
@@ -127,39 +132,79 @@ class LibraryIndexer:
         Returns:
             Number of photos successfully added
         """
+        existing_photos = self.db.get_photos_by_paths(image_paths)
+        photo_columns = self.db.get_photo_columns()
         added = 0
+        new_photos = []
+
+        def add_new_photos(photos):
+            try:
+                return self.db.add_photos(photos)
+            except Exception as e:
+                logger.error("Error adding %s photos to database: %s", len(photos), e)
+                return 0
+
+        def process_image(image_path):
+            """Return (image_path, fields to store) for new or changed images, else None."""
+            try:
+                stat = os.stat(image_path)
+            except OSError as e:
+                logger.error("Error processing image %s: %s", image_path, e)
+                return None
+
+            existing = existing_photos.get(image_path)
+            if existing and not existing.get("is_trashed") and is_hash_current(existing, stat):
+                # Unchanged since it was indexed: the stored hash still holds
+                logger.debug("Photo already exists in database: %s", image_path)
+                return None
+
+            try:
+                # Changed photos (or ones hashed before their mtime, inode and
+                # algorithm were recorded) are only rehashed; new ones get the
+                # metadata that has a column in the photos table too
+                fields = {}
+                if not existing:
+                    metadata = self.metadata_extractor.extract_metadata(image_path, stat)
+                    fields = {key: value for key, value in metadata.items() if key in photo_columns}
+
+                # Calculate file hash for deduplication, recording the size,
+                # mtime and inode it belongs to so later scans can tell if it is stale
+                fields["file_hash"] = self._calculate_file_hash(image_path)
+                fields["hash_algo"] = STORED_HASH_ALGO
+                fields["file_size"] = stat.st_size
+                fields["file_mtime_ns"] = stat.st_mtime_ns
+                fields["file_inode"] = stat.st_ino
+                if existing and existing.get("is_trashed"):
+                    # A file is back at the path of a trashed photo
+                    fields["is_trashed"] = 0
+            except Exception as e:
+                logger.error("Error processing image %s: %s", image_path, e)
+                return None
+            return image_path, fields
 
         # Process in parallel using a thread pool
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Create a function to process each image
-            def process_image(image_path):
-                # Check if photo already exists
-                existing = self.db.get_photo_by_path(image_path)
-                if existing:
-                    logger.debug(f"Photo already exists in database: {image_path}")
-                    return False
-
-                try:
-                    # Extract metadata
-                    metadata = self.metadata_extractor.extract_metadata(image_path)
-
-                    # Calculate file hash for deduplication (can be used in later phases)
-                    file_hash = self._calculate_file_hash(image_path)
-                    metadata["file_hash"] = file_hash
-
-                    # Log metadata for debugging
-                    logger.debug(f"Adding photo to database: {image_path}, metadata: {metadata}")
+            for result in executor.map(process_image, image_paths):
+                if result is None:
+                    continue
+                image_path, fields = result
 
-                    # Add to database
-                    photo_id = self.db.add_photo(image_path, folder_id, **metadata)
-                    return photo_id is not None
-                except Exception as e:
-                    logger.error(f"Error processing image {image_path}: {str(e)}")
-                    return False
+                existing = existing_photos.get(image_path)
+                if existing:
+                    try:
+                        self.db.update_photo(existing["id"], **fields)
+                    except Exception as e:
+                        logger.error("Error rehashing image %s: %s", image_path, e)
+                    continue
 
-            # Submit all tasks and gather results
-            results = list(executor.map(process_image, image_paths))
-            added = sum(1 for result in results if result)
+                # Gather the new photos and add them in batches
+                logger.debug("Adding photo to database: %s, metadata: %s", image_path, fields)
+                new_photos.append((image_path, folder_id, fields))
+                if len(new_photos) >= ADD_PHOTOS_BATCH_SIZE:
+                    added += add_new_photos(new_photos)
+                    new_photos = []
+            if new_photos:
+                added += add_new_photos(new_photos)
 
         return added
 
@@ -169,22 +214,18 @@ class LibraryIndexer:
         cursor.execute('SELECT * FROM folders WHERE is_monitored = 1')
         return [dict(row) for row in cursor.fetchall()]
 
-    def _calculate_file_hash(self, file_path: str, block_size: int = 65536) -> str:
+    def _calculate_file_hash(self, file_path: str, block_size: int = HASH_BLOCK_SIZE) -> str:
         """
-        Calculate SHA-256 hash of a file for deduplication purposes.
+        Calculate the hash of a file for deduplication purposes.
         
         Args:
             file_path: Path to the file
-            block_size: Size of blocks to read
+            block_size: Size of blocks to read when the file cannot be memory-mapped
             
         Returns:
             Hexadecimal string representation of the hash
         """
-        hasher = hashlib.sha256()
-        with open(file_path, 'rb') as f:
-            for block in iter(lambda: f.read(block_size), b''):
-                hasher.update(block)
-        return hasher.hexdigest()
+        return hash_file(file_path, STORED_HASH_ALGO, block_size)
 
     def identify_duplicates(self) -> List[Dict]:
         """
@@ -3,16 +3,30 @@ Metadata extractor for the Pixels photo manager
 """
 
 import logging
+import math
+import numbers
 import os
+import re
 import time
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, Union
 
+import numpy as np
 from PIL import Image, UnidentifiedImageError
-from PIL.ExifTags import TAGS
+from PIL.ExifTags import IFD, TAGS
 from src.core.feature_flags import get_feature_flags
 
 logger = logging.getLogger(__name__)
 
+# EXIF tags read by _extract_exif, by numeric ID. The camera and the last
+# modification date live in the main IFD, the capture settings in the Exif IFD.
+_IFD0_TAGS = {tag_id: name for tag_id, name in TAGS.items()
+              if name in {"Make", "Model", "DateTime"}}
+_EXIF_IFD_TAGS = {tag_id: name for tag_id, name in TAGS.items()
+                  if name in {"DateTimeOriginal", "ExposureTime", "FNumber", "ISOSpeedRatings", "FocalLength"}}
+
+# EXIF date format (YYYY:MM:DD HH:MM:SS), matched in one pass
+_EXIF_DATE_PATTERN = re.compile(r"\d+:\d+:\d+ \d+:\d+:\d+")
+
 
 class MetadataExtractor:
     """
@@ -23,38 +37,52 @@ class MetadataExtractor:
         """Initialize the metadata extractor"""
         self.feature_flags = get_feature_flags()
 
-    def extract_metadata(self, image_path: str) -> Dict[str, Any]:
+    def extract_metadata(self, image_path: str, stat_result: Optional[os.stat_result] = None) -> Dict[str, Any]:
         """
         Extract metadata from an image file
         
         Args:
             image_path: Path to the image file
+            stat_result: os.stat() of the file if the caller already has it (optional)
             
         Returns:
             Dict[str, Any]: Extracted metadata
         """
-        if not os.path.exists(image_path):
-            logger.error(f"Image does not exist: {image_path}")
-            return {'error': f"Image does not exist: {image_path}"}
-
+        file_name = os.path.basename(image_path)
         result = {
-            'filename': os.path.basename(image_path),
-            'file_name': os.path.basename(image_path),  # Add this for test compatibility
+            'filename': file_name,
+            'file_name': file_name,  # Add this for test compatibility
             'path': image_path,
-            'size': os.path.getsize(image_path),
-            'modified_date': time.ctime(os.path.getmtime(image_path)),
-            'created_date': time.ctime(os.path.getctime(image_path)),
         }
 
+        if stat_result is None:
+            try:
+                stat_result = os.stat(image_path)
+            except FileNotFoundError:
+                logger.error("Image does not exist: %s", image_path)
+                result['error'] = f"Image does not exist: {image_path}"
+                return result
+        result['size'] = stat_result.st_size
+        result['modified_date'] = time.ctime(stat_result.st_mtime)
+        result['created_date'] = time.ctime(stat_result.st_ctime)
+
         try:
             with Image.open(image_path) as img:
                 # Extract basic and EXIF metadata
                 self._extract_image_info(img, result)
+
+                # Enhance from the same open image; this must come last, as
+                # it may switch the image to a reduced-size decode
+                if self.feature_flags.enhanced_metadata_extraction:
+                    self._enhance_metadata(img, result)
+        except FileNotFoundError:
+            logger.error("Image does not exist: %s", image_path)
+            result['error'] = f"Image does not exist: {image_path}"
         except UnidentifiedImageError:
-            logger.error(f"Cannot identify image file: {image_path}")
+            logger.error("Cannot identify image file: %s", image_path)
             result['error'] = f"Cannot identify image file: {image_path}"
         except Exception as e:
-            logger.error(f"Error extracting metadata from {image_path}: {e}")
+            logger.error("Error extracting metadata from %s: %s", image_path, e)
             result['error'] = f"Error extracting metadata: {str(e)}"
 
         return result
@@ -72,16 +100,20 @@ class MetadataExtractor:
         if exif_data:
             result.update(exif_data)
 
-    def _process_rational(self, value: Tuple[int, int]) -> Optional[float]:
+    def _process_rational(self, value: Union[Tuple[int, int], numbers.Real]) -> Optional[float]:
         """
-        Process a rational EXIF value (numerator, denominator)
+        Process a rational EXIF value
         
         Args:
-            value: Tuple of (numerator, denominator)
+            value: Tuple of (numerator, denominator), or a number such as the
+                IFDRational Pillow returns
             
         Returns:
             float: The calculated rational value, or None for invalid values
         """
+        if isinstance(value, numbers.Real):
+            value = float(value)
+            return None if math.isnan(value) else value  # IFDRational with a zero denominator is NaN
         if isinstance(value, tuple) and len(value) == 2:
             if value[1] == 0:  # Handle division by zero
                 return None
@@ -98,18 +130,10 @@ class MetadataExtractor:
         Returns:
             Parsed date string or None if invalid
         """
-        try:
-            # Check if date matches EXIF format (YYYY:MM:DD HH:MM:SS)
-            parts = date_str.split(' ')
-            if len(parts) == 2:
-                date_parts = parts[0].split(':')
-                time_parts = parts[1].split(':')
-                if (len(date_parts) == 3 and len(time_parts) == 3 and
-                        all(x.isdigit() for x in date_parts + time_parts)):
-                    return date_str
-            return None
-        except Exception:
-            return None
+        # Check if date matches EXIF format (YYYY:MM:DD HH:MM:SS)
+        if isinstance(date_str, str) and _EXIF_DATE_PATTERN.fullmatch(date_str):
+            return date_str
+        return None
 
     def _extract_exif(self, img: Image) -> Dict[str, Any]:
         """
@@ -127,14 +151,17 @@ class MetadataExtractor:
         if hasattr(img, 'info') and isinstance(img.info.get('exif_data'), dict):
             exif = img.info['exif_data']
         else:
-            # Normal case: try to get EXIF from image
+            # Normal case: read only the tags used below, by numeric ID
             exif = {}
-            if hasattr(img, '_getexif') and callable(img._getexif):
-                exif_data = img._getexif()
-                if exif_data:
-                    for tag_id, value in exif_data.items():
-                        tag = TAGS.get(tag_id, tag_id)
-                        exif[tag] = value
+            exif_data = img.getexif()
+            if exif_data:
+                exif = {name: exif_data[tag_id] for tag_id, name in _IFD0_TAGS.items() if tag_id in exif_data}
+                if IFD.Exif in exif_data:
+                    exif_ifd = exif_data.get_ifd(IFD.Exif)
+                    exif.update((name, exif_ifd[tag_id]) for tag_id, name in _EXIF_IFD_TAGS.items()
+                                if tag_id in exif_ifd)
+                if IFD.GPSInfo in exif_data and self.feature_flags.geolocation_features:
+                    exif['GPSInfo'] = exif_data.get_ifd(IFD.GPSInfo)
 
         if exif:
             result['exif'] = exif
@@ -164,7 +191,7 @@ class MetadataExtractor:
             if 'FocalLength' in exif:
                 result['focal_length'] = self._process_rational(exif['FocalLength'])
 
-            if 'GPSInfo' in exif and self.feature_flags.is_enabled("geolocation_features"):
+            if 'GPSInfo' in exif and self.feature_flags.geolocation_features:
                 result['has_gps_data'] = True
                 gps_info = exif['GPSInfo']
 
@@ -213,40 +240,39 @@ class MetadataExtractor:
                 alt_ref = gps_info.get(5, 0)
                 altitude = gps_info.get(6)
                 if altitude:
-                    alt_value = float(altitude[0]) / float(altitude[1])
+                    alt_value = self._process_rational(altitude)
                     if alt_ref == 1:
                         alt_value = -alt_value
                     result['altitude'] = alt_value
         except Exception as e:
-            logger.error(f"Error processing GPS data: {e}")
+            logger.error("Error processing GPS data: %s", e)
 
         return result
 
     def _convert_to_degrees(self, value):
         """Helper function to convert GPS coordinates to degrees"""
-        d = float(value[0][0]) / float(value[0][1])
-        m = float(value[1][0]) / float(value[1][1])
-        s = float(value[2][0]) / float(value[2][1])
+        d, m, s = (self._process_rational(part) for part in value)
         return d + (m / 60.0) + (s / 3600.0)
 
-    def _enhance_metadata(self, metadata: Dict[str, Any], image_path: str) -> None:
+    def _enhance_metadata(self, img: Image, metadata: Dict[str, Any]) -> None:
         """
         Enhance metadata with additional information (used when enhanced_metadata_extraction flag is enabled)
         
         Args:
+            img: The open image; JPEGs are switched to a reduced-size decode
             metadata: Existing metadata to enhance
-            image_path: Path to the image file
         """
         # Calculate average color
         try:
-            with Image.open(image_path) as img:
-                # Resize to a small image for faster processing
-                small_img = img.resize((50, 50))
-                avg_color = self._get_average_color(small_img)
-                metadata['average_color'] = avg_color
-                metadata['average_color_hex'] = '#{:02x}{:02x}{:02x}'.format(*avg_color)
+            # Let the JPEG decoder scale down while decoding, then resize to
+            # a small image for faster processing
+            img.draft('RGB', (50, 50))
+            small_img = img.resize((50, 50))
+            avg_color = self._get_average_color(small_img)
+            metadata['average_color'] = avg_color
+            metadata['average_color_hex'] = '#{:02x}{:02x}{:02x}'.format(*avg_color)
         except Exception as e:
-            logger.error(f"Error calculating average color: {e}")
+            logger.error("Error calculating average color: %s", e)
 
     def _get_average_color(self, image) -> tuple:
         """Calculate the average color of an image"""
@@ -254,17 +280,7 @@ class MetadataExtractor:
         if image.mode != 'RGB':
             image = image.convert('RGB')
 
-        # Get the pixels
-        pixels = list(image.getdata())
-
-        # Calculate the average
-        r_total = sum(p[0] for p in pixels)
-        g_total = sum(p[1] for p in pixels)
-        b_total = sum(p[2] for p in pixels)
-
+        # Sum each channel over a view of the pixel buffer
+        pixels = np.asarray(image).reshape(-1, 3)
         pixel_count = len(pixels)
-        return (
-            r_total // pixel_count,
-            g_total // pixel_count,
-            b_total // pixel_count
-        )
+        return tuple(int(total) // pixel_count for total in pixels.sum(axis=0, dtype=np.uint64))
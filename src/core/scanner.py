@@ -36,7 +36,7 @@ class FileSystemScanner:
             Dictionary containing scan results
         """
         if not os.path.exists(path) or not os.path.isdir(path):
-            logger.error(f"Path does not exist or is not a directory: {path}")
+            logger.error("Path does not exist or is not a directory: %s", path)
             return {}
 
         try:
@@ -62,7 +62,7 @@ class FileSystemScanner:
             return result
 
         except Exception as e:
-            logger.error(f"Error scanning directory {path}: {e}")
+            logger.error("Error scanning directory %s: %s", path, e)
             return {}
 
     def is_supported_image(self, filename: str) -> bool:
@@ -10,8 +10,6 @@ from typing import Dict, List, Optional
 # Import our core components
 from .database import PhotoDatabase
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -56,7 +54,7 @@ class TagManager:
                 return self.db.get_tag(tag_id)
             return None
         except Exception as e:
-            logger.error(f"Error creating tag: {str(e)}")
+            logger.error("Error creating tag: %s", e)
             return None
 
     def update_tag(self, tag_id: int, name: str = None, parent_id: int = None) -> bool:
@@ -80,7 +78,7 @@ class TagManager:
 
             return self.db.update_tag(tag_id, name, parent_id)
         except Exception as e:
-            logger.error(f"Error updating tag {tag_id}: {str(e)}")
+            logger.error("Error updating tag %s: %s", tag_id, e)
             return False
 
     def delete_tag(self, tag_id: int) -> bool:
@@ -96,7 +94,7 @@ class TagManager:
         try:
             return self.db.delete_tag(tag_id)
         except Exception as e:
-            logger.error(f"Error deleting tag {tag_id}: {str(e)}")
+            logger.error("Error deleting tag %s: %s", tag_id, e)
             return False
 
     def get_tag_hierarchy(self) -> List[Dict]:
@@ -109,7 +107,7 @@ class TagManager:
         try:
             return self.db.get_tag_hierarchy()
         except Exception as e:
-            logger.error(f"Error retrieving tag hierarchy: {str(e)}")
+            logger.error("Error retrieving tag hierarchy: %s", e)
             return []
 
     def get_all_tags(self, include_count: bool = False) -> List[Dict]:
@@ -131,7 +129,7 @@ class TagManager:
 
             return tags
         except Exception as e:
-            logger.error(f"Error retrieving tags: {str(e)}")
+            logger.error("Error retrieving tags: %s", e)
             return []
 
     # Photo tagging operations
@@ -149,7 +147,7 @@ class TagManager:
         try:
             return self.db.add_tag_to_photo(photo_id, tag_id)
         except Exception as e:
-            logger.error(f"Error adding tag {tag_id} to photo {photo_id}: {str(e)}")
+            logger.error("Error adding tag %s to photo %s: %s", tag_id, photo_id, e)
             return False
 
     def add_tag_to_photos(self, photo_ids: List[int], tag_id: int) -> int:
@@ -170,7 +168,7 @@ class TagManager:
                     count += 1
             return count
         except Exception as e:
-            logger.error(f"Error adding tag {tag_id} to multiple photos: {str(e)}")
+            logger.error("Error adding tag %s to multiple photos: %s", tag_id, e)
             return count
 
     def add_tags_to_photo(self, photo_id: int, tag_ids: List[int]) -> int:
@@ -191,7 +189,7 @@ class TagManager:
                     count += 1
             return count
         except Exception as e:
-            logger.error(f"Error adding multiple tags to photo {photo_id}: {str(e)}")
+            logger.error("Error adding multiple tags to photo %s: %s", photo_id, e)
             return count
 
     def add_tag_by_name_to_photo(self, photo_id: int, tag_name: str) -> bool:
@@ -223,7 +221,7 @@ class TagManager:
 
             return self.db.add_tag_to_photo(photo_id, tag_id)
         except Exception as e:
-            logger.error(f"Error adding tag '{tag_name}' to photo {photo_id}: {str(e)}")
+            logger.error("Error adding tag '%s' to photo %s: %s", tag_name, photo_id, e)
             return False
 
     def remove_tag_from_photo(self, photo_id: int, tag_id: int) -> bool:
@@ -240,7 +238,7 @@ class TagManager:
         try:
             return self.db.remove_tag_from_photo(photo_id, tag_id)
         except Exception as e:
-            logger.error(f"Error removing tag {tag_id} from photo {photo_id}: {str(e)}")
+            logger.error("Error removing tag %s from photo %s: %s", tag_id, photo_id, e)
             return False
 
     def remove_tag_from_photos(self, photo_ids: List[int], tag_id: int) -> int:
@@ -261,7 +259,7 @@ class TagManager:
                     count += 1
             return count
         except Exception as e:
-            logger.error(f"Error removing tag {tag_id} from multiple photos: {str(e)}")
+            logger.error("Error removing tag %s from multiple photos: %s", tag_id, e)
             return count
 
     def get_photos_by_tag(self, tag_id: int, limit: int = 100, offset: int = 0) -> List[Dict]:
@@ -279,7 +277,7 @@ class TagManager:
         try:
             return self.db.get_photos_by_tag(tag_id, limit, offset)
         except Exception as e:
-            logger.error(f"Error getting photos with tag {tag_id}: {str(e)}")
+            logger.error("Error getting photos with tag %s: %s", tag_id, e)
             return []
 
     def get_tags_for_photo(self, photo_id: int) -> List[Dict]:
@@ -295,7 +293,7 @@ class TagManager:
         try:
             return self.db.get_tags_for_photo(photo_id)
         except Exception as e:
-            logger.error(f"Error getting tags for photo {photo_id}: {str(e)}")
+            logger.error("Error getting tags for photo %s: %s", photo_id, e)
             return []
 
     def find_tag_suggestions(self, partial_name: str, limit: int = 10) -> List[Dict]:
@@ -322,7 +320,7 @@ class TagManager:
             )
             return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
-            logger.error(f"Error finding tag suggestions: {str(e)}")
+            logger.error("Error finding tag suggestions: %s", e)
             return []
 
     def _get_tag_photo_count(self, tag_id: int) -> int:
@@ -352,7 +350,7 @@ class TagManager:
 
             return self.db.update_photo(photo_id, rating=rating)
         except Exception as e:
-            logger.error(f"Error setting rating for photo {photo_id}: {str(e)}")
+            logger.error("Error setting rating for photo %s: %s", photo_id, e)
             return False
 
     def set_photos_rating(self, photo_ids: List[int], rating: int) -> int:
@@ -376,7 +374,7 @@ class TagManager:
                     count += 1
             return count
         except Exception as e:
-            logger.error(f"Error setting rating for multiple photos: {str(e)}")
+            logger.error("Error setting rating for multiple photos: %s", e)
             return count
 
     def toggle_photo_favorite(self, photo_id: int) -> Optional[bool]:
@@ -402,7 +400,7 @@ class TagManager:
                 return new_status
             return None
         except Exception as e:
-            logger.error(f"Error toggling favorite status for photo {photo_id}: {str(e)}")
+            logger.error("Error toggling favorite status for photo %s: %s", photo_id, e)
             return None
 
     def set_photo_favorite(self, photo_id: int, favorite: bool) -> bool:
@@ -419,7 +417,7 @@ class TagManager:
         try:
             return self.db.update_photo(photo_id, is_favorite=1 if favorite else 0)
         except Exception as e:
-            logger.error(f"Error setting favorite status for photo {photo_id}: {str(e)}")
+            logger.error("Error setting favorite status for photo %s: %s", photo_id, e)
             return False
 
     def set_photos_favorite(self, photo_ids: List[int], favorite: bool) -> int:
@@ -440,7 +438,7 @@ class TagManager:
                     count += 1
             return count
         except Exception as e:
-            logger.error(f"Error setting favorite status for multiple photos: {str(e)}")
+            logger.error("Error setting favorite status for multiple photos: %s", e)
             return count
 
     def get_photos_by_rating(self, min_rating: int, limit: int = 100, offset: int = 0) -> List[Dict]:
@@ -458,7 +456,7 @@ class TagManager:
         try:
             return self.db.get_photos_by_rating(min_rating, limit, offset)
         except Exception as e:
-            logger.error(f"Error getting photos with minimum rating {min_rating}: {str(e)}")
+            logger.error("Error getting photos with minimum rating %s: %s", min_rating, e)
             return []
 
     def get_favorite_photos(self, limit: int = 100, offset: int = 0) -> List[Dict]:
@@ -475,5 +473,5 @@ class TagManager:
         try:
             return self.db.get_favorite_photos(limit, offset)
         except Exception as e:
-            logger.error(f"Error getting favorite photos: {str(e)}")
+            logger.error("Error getting favorite photos: %s", e)
             return []
@@ -47,11 +47,11 @@ class ThumbnailService:
         except OSError as e:
             # Handle rare race condition or permission issues
             if e.errno != errno.EEXIST:
-                logger.error(f"Failed to create thumbnail directory: {e}")
+                logger.error("Failed to create thumbnail directory: %s", e)
                 # Fall back to a temp directory if possible
                 import tempfile
                 self.thumbnail_dir = tempfile.gettempdir()
-                logger.info(f"Using temporary directory for thumbnails: {self.thumbnail_dir}")
+                logger.info("Using temporary directory for thumbnails: %s", self.thumbnail_dir)
 
         # Get feature flags
         self.feature_flags = get_feature_flags()
@@ -68,7 +68,7 @@ class ThumbnailService:
             str: Path to the generated thumbnail, or None if generation failed
         """
         if not self.test_mode and not os.path.exists(image_path):
-            logger.error(f"Image does not exist: {image_path}")
+            logger.error("Image does not exist: %s", image_path)
             return None
 
         try:
@@ -97,13 +97,13 @@ class ThumbnailService:
 
             # Check if thumbnail already exists
             if os.path.exists(thumbnail_path):
-                logger.debug(f"Thumbnail already exists: {thumbnail_path}")
+                logger.debug("Thumbnail already exists: %s", thumbnail_path)
                 return thumbnail_path
 
             # Open the image
             with Image.open(image_path) as img:
                 # Use optimized thumbnail generation if enabled
-                if self.feature_flags.is_enabled("optimized_thumbnail_generation"):
+                if self.feature_flags.optimized_thumbnail_generation:
                     # This uses PIL's thumbnail method which preserves aspect ratio
                     img.thumbnail(thumbnail_size)
                     thumbnail = img
@@ -117,20 +117,20 @@ class ThumbnailService:
                     thumbnail.save(thumbnail_path, "JPEG", quality=85, optimize=True)
                 except OSError as e:
                     if e.errno == errno.EEXIST:
-                        logger.debug(f"Thumbnail was created by another process: {thumbnail_path}")
+                        logger.debug("Thumbnail was created by another process: %s", thumbnail_path)
                         return thumbnail_path
                     else:
                         # Re-raise other errors
                         raise
 
-            logger.debug(f"Generated thumbnail: {thumbnail_path}")
+            logger.debug("Generated thumbnail: %s", thumbnail_path)
             return thumbnail_path
 
         except UnidentifiedImageError:
-            logger.error(f"Cannot identify image file: {image_path}")
+            logger.error("Cannot identify image file: %s", image_path)
             return None
         except Exception as e:
-            logger.error(f"Error generating thumbnail for {image_path}: {e}")
+            logger.error("Error generating thumbnail for %s: %s", image_path, e)
             return None
 
     def get_cached_thumbnail(self, image_path: str, size: str = None) -> Optional[str]:
@@ -181,5 +181,5 @@ class ThumbnailService:
             if os.path.isfile(file_path):
                 os.remove(file_path)
                 count += 1
-        logger.info(f"Cleared {count} thumbnails")
+        logger.info("Cleared %s thumbnails", count)
         return count
@@ -1,3 +1,6 @@
+import os
+from datetime import datetime
+
 import pytest
 from src.core.database import PhotoDatabase
 
@@ -29,3 +32,157 @@ def test_find_duplicates(photo_database):
     duplicates = photo_database.find_duplicates()
     assert len(duplicates) == 1
     assert duplicates[0]['file_hash'] == "hash1"
+
+
+def test_find_duplicates_in_folder(photo_database):
+    folder_id = photo_database.add_folder(path="/test/dupes")
+    other_id = photo_database.add_folder(path="/test/other")
+    photo_database.add_photo(file_path="/test/dupes/photo1.jpg", folder_id=folder_id, file_hash="hash1")
+    photo_database.add_photo(file_path="/test/dupes/photo2.jpg", folder_id=folder_id, file_hash="hash1")
+    photo_database.add_photo(file_path="/test/other/photo1.jpg", folder_id=other_id, file_hash="hash1")
+    duplicates = photo_database.find_duplicates(folder_id)
+    assert len(duplicates) == 1
+    assert len(duplicates[0]['photo_ids']) == 2
+    assert photo_database.find_duplicates(other_id) == []
+
+
+def test_permanently_delete_photos(photo_database, tmp_path):
+    folder_id = photo_database.add_folder(path=str(tmp_path))
+    paths = []
+    for name in ("photo1.jpg", "photo2.jpg"):
+        path = tmp_path / name
+        path.write_bytes(b"test content")
+        paths.append(str(path))
+    photo_ids = [photo_database.add_photo(file_path=path, folder_id=folder_id) for path in paths]
+    assert photo_database.permanently_delete_photos(photo_ids) == 2
+    assert all(photo_database.get_photo(photo_id) is None for photo_id in photo_ids)
+    assert not any(os.path.exists(path) for path in paths)
+
+
+def test_move_photos_to_trash(photo_database, tmp_path, monkeypatch):
+    trash_path = tmp_path / "trash"
+    monkeypatch.setattr(photo_database, "app_trash_path", str(trash_path))
+    folder_id = photo_database.add_folder(path=str(tmp_path))
+    paths = []
+    for index, subfolder in enumerate(("a", "b")):
+        (tmp_path / subfolder).mkdir()
+        path = tmp_path / subfolder / "IMG_0001.jpg"
+        path.write_bytes(b"content %d" % index)
+        paths.append(str(path))
+    photo_ids = [photo_database.add_photo(file_path=path, folder_id=folder_id) for path in paths]
+    assert photo_database.move_photos_to_trash(photo_ids) == 2
+    assert all(photo_database.get_photo(photo_id)['is_trashed'] == 1 for photo_id in photo_ids)
+    assert not any(os.path.exists(path) for path in paths)
+    assert sorted(p.read_bytes() for p in trash_path.iterdir()) == [b"content 0", b"content 1"]
+
+
+def test_find_duplicates_skips_trashed_photos(photo_database, tmp_path, monkeypatch):
+    monkeypatch.setattr(photo_database, "app_trash_path", str(tmp_path / "trash"))
+    folder_id = photo_database.add_folder(path=str(tmp_path))
+    photo_ids = []
+    for name in ("copy1.jpg", "copy2.jpg", "copy3.jpg"):
+        path = tmp_path / name
+        path.write_bytes(b"same content")
+        photo_ids.append(photo_database.add_photo(file_path=str(path), folder_id=folder_id,
+                                                  file_hash="trashed_hash", file_size=12))
+
+    assert photo_database.move_photos_to_trash(photo_ids[:1]) == 1
+    duplicates = photo_database.find_duplicates(folder_id)
+    assert [group['photo_ids'] for group in duplicates] == [[str(photo_id) for photo_id in photo_ids[1:]]]
+    assert photo_database.get_photos_with_shared_size(folder_id) == [
+        photo_database.get_photo(photo_id) for photo_id in photo_ids[1:]]
+
+    assert photo_database.move_photos_to_trash(photo_ids[1:2]) == 1
+    assert photo_database.find_duplicates(folder_id) == []
+
+
+def test_get_photos_with_shared_size(photo_database):
+    folder_id = photo_database.add_folder(path="/test/sizes")
+    photo_database.add_photo(file_path="/test/sizes/photo1.jpg", folder_id=folder_id, file_size=1234)
+    photo_database.add_photo(file_path="/test/sizes/photo2.jpg", folder_id=folder_id, file_size=1234)
+    photo_database.add_photo(file_path="/test/sizes/photo3.jpg", folder_id=folder_id, file_size=5678)
+    photos = photo_database.get_photos_with_shared_size(folder_id)
+    assert sorted(photo['file_name'] for photo in photos) == ["photo1.jpg", "photo2.jpg"]
+
+
+def test_get_photos(photo_database):
+    folder_id = photo_database.add_folder(path="/test/bulk")
+    photo1_id = photo_database.add_photo(file_path="/test/bulk/photo1.jpg", folder_id=folder_id)
+    photo2_id = photo_database.add_photo(file_path="/test/bulk/photo2.jpg", folder_id=folder_id)
+    photos = photo_database.get_photos([photo1_id, photo2_id, 9999])
+    assert set(photos) == {photo1_id, photo2_id}
+    assert photos[photo2_id]['file_name'] == "photo2.jpg"
+
+
+def test_get_revision_changes_on_write(photo_database):
+    revision = photo_database.get_revision()
+    assert photo_database.get_revision() == revision
+    photo_database.add_folder(path="/test/revision")
+    assert photo_database.get_revision() != revision
+
+
+def test_update_photo_perceptual_hashes(photo_database):
+    folder_id = photo_database.add_folder(path="/test/phash")
+    photo_id = photo_database.add_photo(file_path="/test/phash/photo1.jpg", folder_id=folder_id)
+    assert photo_id in {photo['id'] for photo in photo_database.get_photos_without_perceptual_hash()}
+
+    assert photo_database.update_photo_perceptual_hashes([(photo_id, "ff" * 32)]) == 1
+    stored = {photo['id']: photo['perceptual_hash'] for photo in photo_database.get_photos_with_perceptual_hash()}
+    assert stored[photo_id] == b"\xff" * 32
+
+
+def test_add_photos(photo_database):
+    folder_id = photo_database.add_folder("/batch")
+    added = photo_database.add_photos([
+        ("/batch/a.jpg", folder_id, {"file_size": 10, "width": 100}),
+        ("/batch/b.jpg", folder_id, {"file_size": 20}),
+        ("/batch/c.jpg", folder_id, {"file_size": 30, "width": 300}),
+    ])
+    assert added == 3
+
+    photo = photo_database.get_photo_by_path("/batch/c.jpg")
+    assert photo["file_name"] == "c.jpg"
+    assert photo["folder_id"] == folder_id
+    assert (photo["file_size"], photo["width"]) == (30, 300)
+    assert datetime.strptime(photo["date_added"], "%Y-%m-%d %H:%M:%S")
+
+    # Paths already in the database are ignored
+    assert photo_database.add_photos([("/batch/a.jpg", folder_id, {})]) == 0
+
+
+def test_add_photos_skips_bad_rows(photo_database):
+    folder_id = photo_database.add_folder("/batch_bad")
+    added = photo_database.add_photos([
+        ("/batch_bad/a.jpg", folder_id, {"file_size": 10}),
+        ("/batch_bad/b.jpg", folder_id, {"width": (1, 2)}),
+        ("/batch_bad/c.jpg", folder_id, {"file_size": 30}),
+    ])
+    assert added == 2
+    assert photo_database.get_photo_by_path("/batch_bad/b.jpg") is None
+    assert photo_database.get_photo_by_path("/batch_bad/c.jpg")["file_size"] == 30
+
+
+def test_get_photos_by_paths(photo_database):
+    folder_id = photo_database.add_folder("/by_path")
+    photo_id = photo_database.add_photo("/by_path/a.jpg", folder_id)
+
+    photos = photo_database.get_photos_by_paths(["/by_path/a.jpg", "/by_path/missing.jpg"])
+    assert list(photos) == ["/by_path/a.jpg"]
+    assert photos["/by_path/a.jpg"]["id"] == photo_id
+
+
+def test_get_duplicate_stats(photo_database):
+    folder_id = photo_database.add_folder("/stats")
+    for name in ("a.jpg", "b.jpg", "c.jpg"):
+        photo_database.add_photo(f"/stats/{name}", folder_id, file_hash="hash1", file_size=100)
+
+    # The aggregate query agrees with summing over the loaded groups
+    groups = photo_database.find_duplicates()
+    photos = photo_database.get_photos([int(photo_id) for group in groups for photo_id in group["photo_ids"]])
+    sizes = [[photos[int(photo_id)]["file_size"] or 0 for photo_id in group["photo_ids"]] for group in groups]
+    assert photo_database.get_duplicate_stats() == {
+        "total_groups": len(groups),
+        "total_duplicates": sum(len(group) - 1 for group in sizes),
+        "wasted_space_bytes": sum(sum(group[1:]) for group in sizes),
+        "largest_group_size": max(len(group) for group in sizes),
+    }
@@ -7,10 +7,10 @@ import tempfile
 import pytest
 import shutil
 from pathlib import Path
-import hashlib
 
 from src.core.duplicate_detection_service import DuplicateDetectionService
 from src.core.database import PhotoDatabase
+from src.core.hashing import HASH_ALGORITHMS, hash_file
 
 
 @pytest.fixture
@@ -26,6 +26,15 @@ def temp_db():
             pass  # File might be closed/deleted already
 
 
+@pytest.fixture
+def fresh_db(monkeypatch):
+    """Create a new in-memory database instead of reusing the singleton"""
+    monkeypatch.setattr(PhotoDatabase, "_instance", None)
+    db = PhotoDatabase(db_path=':memory:')
+    yield db
+    db.close()
+
+
 @pytest.fixture
 def test_library():
     """Create a temporary test library with image files"""
@@ -72,14 +81,13 @@ def test_calculate_file_hash(duplicate_detection_service):
         hash1 = duplicate_detection_service.calculate_file_hash(f.name)
         
         # Calculate expected hash directly
-        hasher = hashlib.sha256()
+        hasher = HASH_ALGORITHMS[duplicate_detection_service.hash_algo]()
         with open(f.name, 'rb') as f2:
             hasher.update(f2.read())
         expected_hash = hasher.hexdigest()
         
         # Compare results
         assert hash1 == expected_hash
-        assert len(hash1) == 64  # SHA-256 produces 64 character hex strings
 
 
 def test_find_exact_duplicates(populated_db):
@@ -157,4 +165,34 @@ def test_scan_and_index_folder(duplicate_detection_service, test_library):
     assert photos_added >= 4
     
     # Should find 2 duplicates
-    assert duplicates_found == 2
\ No newline at end of file
+    assert duplicates_found == 2
+
+
+def test_calculate_file_hash_reuses_stored_hash(fresh_db, tmp_path):
+    """Unchanged indexed files are not read again"""
+    service = DuplicateDetectionService(db=fresh_db)
+    path = tmp_path / "indexed.jpg"
+    path.write_bytes(b"indexed content")
+    stat = path.stat()
+    folder_id = fresh_db.add_folder(str(tmp_path))
+    fresh_db.add_photo(str(path), folder_id, file_hash="stored", hash_algo=service.hash_algo,
+                       file_size=stat.st_size, file_mtime_ns=stat.st_mtime_ns, file_inode=stat.st_ino)
+    assert service.calculate_file_hash(str(path)) == "stored"
+
+    path.write_bytes(b"edited content")
+    assert service.calculate_file_hash(str(path)) == hash_file(str(path), service.hash_algo)
+
+
+def test_duplicates_cached_until_database_changes(fresh_db):
+    """Repeated duplicate queries reuse the result while the database is unchanged"""
+    service = DuplicateDetectionService(db=fresh_db)
+    folder_id = fresh_db.add_folder("/cached")
+    fresh_db.add_photo("/cached/a.jpg", folder_id, file_hash="hash1")
+    fresh_db.add_photo("/cached/b.jpg", folder_id, file_hash="hash1")
+
+    duplicates = service.find_duplicates_in_folder(folder_id)
+    assert service.find_duplicates_in_folder(folder_id) is duplicates
+
+    fresh_db.add_photo("/cached/c.jpg", folder_id, file_hash="hash1")
+    duplicates = service.find_duplicates_in_folder(folder_id)
+    assert [len(group["photos"]) for group in duplicates] == [3]
@@ -0,0 +1,72 @@
+import hashlib
+import os
+
+from src.core.hashing import (FAST_HASH_ALGO, HASH_ALGORITHMS, PREFETCH_THRESHOLD, STORED_HASH_ALGO, hash_file,
+                              hash_file_prefix, hash_files, is_hash_current)
+
+
+def test_hash_file_matches_hashlib(tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"test content" * 1000)
+    assert hash_file(str(path)) == hashlib.sha256(path.read_bytes()).hexdigest()
+    assert hash_file(str(path), "blake2b") == hashlib.blake2b(path.read_bytes()).hexdigest()
+
+
+def test_hash_empty_file(tmp_path):
+    # Empty files cannot be memory-mapped and take the block-reading path
+    path = tmp_path / "empty.jpg"
+    path.touch()
+    assert hash_file(str(path), block_size=1024) == hashlib.sha256(b"").hexdigest()
+
+
+def test_fast_hash_algo_is_available():
+    assert FAST_HASH_ALGO in HASH_ALGORITHMS
+
+
+def test_hash_files_keeps_order_and_skips_missing(tmp_path):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"photo{i}.jpg"
+        path.write_bytes(bytes([i]) * 100)
+        paths.append(str(path))
+    paths.append(str(tmp_path / "missing.jpg"))
+
+    hashes = hash_files(paths, max_workers=2)
+    assert hashes[:4] == [hash_file(path) for path in paths[:4]]
+    assert hashes[4] is None
+
+
+def test_hash_file_large_file(tmp_path):
+    path = tmp_path / "large.jpg"
+    data = os.urandom(PREFETCH_THRESHOLD + 123)
+    path.write_bytes(data)
+    assert hash_file(str(path)) == hashlib.sha256(data).hexdigest()
+
+
+def test_is_hash_current(tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"original")
+    stat = path.stat()
+    photo = {"file_hash": "stored", "hash_algo": STORED_HASH_ALGO, "file_size": stat.st_size,
+             "file_mtime_ns": stat.st_mtime_ns, "file_inode": stat.st_ino}
+    assert is_hash_current(photo, stat)
+
+    # Hashes made with another algorithm are migrated by rehashing
+    other_algo = next(algo for algo in HASH_ALGORITHMS if algo != STORED_HASH_ALGO)
+    assert not is_hash_current(dict(photo, hash_algo=other_algo), stat)
+
+    # Rows indexed before inodes were recorded are rehashed once
+    assert not is_hash_current(dict(photo, file_inode=None), stat)
+
+    path.write_bytes(b"edited content")
+    assert not is_hash_current(photo, path.stat())
+
+
+def test_hash_file_prefix(tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(b"head" + b"tail" * 100)
+    assert hash_file_prefix(str(path), size=4) == hashlib.sha256(b"head").hexdigest()
+
+    # Files no larger than the prefix hash the same as their full hash
+    assert hash_file_prefix(str(path), size=1 << 16) == hash_file(str(path))
+    assert hash_files([str(path)], prefix_size=4) == [hash_file_prefix(str(path), size=4)]
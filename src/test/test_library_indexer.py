@@ -3,6 +3,8 @@ import tempfile
 from pathlib import Path
 
 import pytest
+from PIL import Image
+from src.core.hashing import HASH_ALGORITHMS, STORED_HASH_ALGO
 from src.core.library_indexer import LibraryIndexer
 
 
@@ -121,13 +123,60 @@ def test_hash_calculation(indexer):
 
         hash1 = indexer._calculate_file_hash(f.name)
         assert isinstance(hash1, str)
-        assert len(hash1) == 64  # SHA-256 hash length
+        assert len(hash1) == len(HASH_ALGORITHMS[STORED_HASH_ALGO]().hexdigest())
 
         # Test with different block sizes
         hash2 = indexer._calculate_file_hash(f.name, block_size=1024)
         assert hash1 == hash2  # Hash should be the same regardless of block size
 
 
+def test_rehash_only_changed_files(indexer, test_library, monkeypatch):
+    image_path = str(Path(test_library) / "test1.jpg")
+    stat = Path(image_path).stat()
+    folder_id = indexer.db.add_folder(test_library)
+    photo_id = indexer.db.add_photo(image_path, folder_id, file_hash="stored", hash_algo=STORED_HASH_ALGO,
+                                    file_size=stat.st_size, file_mtime_ns=stat.st_mtime_ns,
+                                    file_inode=stat.st_ino)
+    hashed = []
+    monkeypatch.setattr(indexer, "_calculate_file_hash", lambda path: hashed.append(path) or "fresh")
+
+    # Unchanged since indexing: the stored hash is kept without reading the file
+    indexer._process_images([image_path], folder_id)
+    assert hashed == []
+
+    Path(image_path).write_bytes(b"edited")
+    indexer._process_images([image_path], folder_id)
+    assert hashed == [image_path]
+    assert indexer.db.get_photo(photo_id)["file_hash"] == "fresh"
+
+
+def test_refresh_rehashes_other_algorithm(indexer, tmp_path):
+    image_path = tmp_path / "refresh_algo.jpg"
+    image_path.write_bytes(b"refresh algorithm content")
+    stat = image_path.stat()
+    folder_id = indexer.db.add_folder(str(tmp_path), is_monitored=True)
+    photo_id = indexer.db.add_photo(str(image_path), folder_id, file_hash="old", hash_algo="other",
+                                    file_size=stat.st_size, file_mtime_ns=stat.st_mtime_ns,
+                                    file_inode=stat.st_ino)
+
+    indexer.refresh_index()
+    photo = indexer.db.get_photo(photo_id)
+    assert photo["hash_algo"] == STORED_HASH_ALGO
+    assert photo["file_hash"] == indexer._calculate_file_hash(str(image_path))
+
+
+def test_enhanced_metadata_stores_known_columns_only(indexer, tmp_path, monkeypatch):
+    image_path = tmp_path / "enhanced.jpg"
+    Image.new('RGB', (40, 30), (200, 100, 50)).save(image_path)
+    monkeypatch.setattr(indexer.metadata_extractor.feature_flags, 'enhanced_metadata_extraction', True)
+    folder_id = indexer.db.add_folder(str(tmp_path))
+
+    assert indexer._process_images([str(image_path)], folder_id) == 1
+    photo = indexer.db.get_photos_by_paths([str(image_path)])[str(image_path)]
+    assert (photo["width"], photo["height"]) == (40, 30)
+    assert "average_color" not in photo
+
+
 def test_duplicate_handling_edge_cases(indexer, test_library):
     # Test handling of zero-byte files
     file1 = Path(test_library) / "empty1.jpg"
@@ -2,6 +2,7 @@ import io
 
 import pytest
 from PIL import Image
+from PIL.TiffImagePlugin import IFDRational
 from src.core.metadata_extractor import MetadataExtractor
 
 
@@ -50,6 +51,16 @@ def test_process_rational(extractor):
     assert extractor._process_rational("invalid") is None
 
 
+def test_gps_rationals_from_pillow(extractor):
+    # Pillow returns EXIF rationals as IFDRational rather than tuples
+    assert extractor._process_rational(IFDRational(1, 250)) == 0.004
+    assert extractor._process_rational(IFDRational(1, 0)) is None
+
+    gps_info = {1: 'S', 2: (IFDRational(52, 1), IFDRational(30, 1), IFDRational(0, 1)),
+                3: 'E', 4: ((1, 1), (15, 1), (36, 1))}
+    assert extractor._extract_gps_info(gps_info) == {'latitude': -52.5, 'longitude': 1.26}
+
+
 def test_nonexistent_file(extractor):
     metadata = extractor.extract_metadata("/nonexistent/image.jpg")
     assert "error" in metadata
@@ -123,3 +134,22 @@ def test_invalid_gps_data(extractor):
 
     result = extractor._extract_gps_info(invalid_gps_info)
     assert result == {}
+
+
+def test_average_color(extractor):
+    img = Image.new('RGB', (2, 1))
+    img.putpixel((0, 0), (10, 20, 255))
+    img.putpixel((1, 0), (11, 40, 0))
+    assert extractor._get_average_color(img) == (10, 30, 127)
+    assert extractor._get_average_color(Image.new('L', (4, 4), 200)) == (200, 200, 200)
+
+
+def test_enhanced_metadata_keeps_full_size(extractor, tmp_path, monkeypatch):
+    image_path = tmp_path / "enhanced.jpg"
+    Image.new('RGB', (400, 300), (200, 100, 50)).save(image_path)
+    monkeypatch.setattr(extractor.feature_flags, 'enhanced_metadata_extraction', True)
+
+    metadata = extractor.extract_metadata(str(image_path))
+    assert (metadata["width"], metadata["height"]) == (400, 300)
+    assert metadata["average_color_hex"].startswith('#')
+    assert all(abs(a - b) <= 2 for a, b in zip(metadata["average_color"], (200, 100, 50)))